@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Non-interactive batch conversion of many rule source files to .mdc.
+
+Sources are given as files, directories (searched recursively) or glob
+patterns, converted in a process pool and summarized in one JSON manifest.
+
+Usage:
+    python batch_convert.py rules/ "extra/*.txt" -o mdc_rules --manifest manifest.json
+    python batch_convert.py dumps/ --format blocks -o mdc_rules --workers 8
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from cursor_rules_convert import convert_rules
+from mdc_writer import CREATED, UNCHANGED, UPDATED, OutputManifest, WriteStats
+from rule_model import RuleBuffer
+from rule_parser import save_rule_file
+
+FORMATS = ("rules", "blocks")
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.cursorrules")
+
+
+def collect_sources(inputs, patterns=DEFAULT_PATTERNS):
+    """Expand files, directories and glob patterns into a sorted list of files."""
+    sources = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in patterns:
+                sources.update(str(p) for p in Path(item).rglob(pattern) if p.is_file())
+        elif os.path.isfile(item):
+            sources.add(item)
+        else:
+            sources.update(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+    return sorted(sources)
+
+
+def convert_source(task):
+    """Convert one source file; runs in a worker process."""
+    source, output_dir, source_format = task
+    stats = WriteStats()
+    start = time.perf_counter()
+    try:
+        if source_format == "rules":
+            with open(source, "r", encoding="utf-8") as f:
+                outputs = convert_rules(f.read(), output_dir, stats, verbose=False)
+        else:
+            outputs = []
+            with RuleBuffer.open(source) as buffer:
+                for index, block in enumerate(buffer.rules("blocks"), 1):
+                    filename = save_rule_file(block, output_dir, index, stats)
+                    outputs.append(os.path.join(output_dir, filename))
+        error = None
+    except Exception as e:
+        # Report whatever was written before the failure
+        outputs = sorted(stats.produced)
+        error = str(e)
+
+    return {
+        "source": source,
+        "outputs": outputs,
+        "created": stats.created,
+        "updated": stats.updated,
+        "unchanged": stats.unchanged,
+        "seconds": round(time.perf_counter() - start, 6),
+        "error": error,
+    }
+
+
+def batch_convert(inputs, output_dir="mdc_rules", source_format="rules", workers=None, prune=False):
+    """Convert all sources in parallel and return the manifest dict."""
+    os.makedirs(output_dir, exist_ok=True)
+    sources = collect_sources(inputs)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    tasks = [(source, output_dir, source_format) for source in sources]
+    # Small rule files convert in well under a millisecond, so hand them out in chunks
+    chunksize = max(1, len(tasks) // (workers * 8))
+    if workers == 1:
+        results = [convert_source(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(convert_source, tasks, chunksize=chunksize))
+
+    # Outputs written by more than one source overwrite each other
+    owners = {}
+    for result in results:
+        for output in result["outputs"]:
+            owners.setdefault(os.path.abspath(output), []).append(result["source"])
+    collisions = {path: owners_ for path, owners_ in owners.items() if len(owners_) > 1}
+
+    stats = WriteStats()
+    stats.produced = set(owners)
+    for result in results:
+        stats.created += result["created"]
+        stats.updated += result["updated"]
+        stats.unchanged += result["unchanged"]
+    manifest = OutputManifest(output_dir)
+    stats.find_stale(manifest, sources)
+    failed = sum(1 for r in results if r["error"])
+    # A failed source's earlier outputs look stale; never delete them on a partial run
+    prune_skipped = prune and failed > 0
+    if prune and not prune_skipped:
+        stats.prune()
+    for result in results:
+        stats.update_manifest(manifest, result["source"], result["outputs"])
+    manifest.save()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "output_dir": output_dir,
+        "format": source_format,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "totals": {
+            "sources": len(sources),
+            "failed": failed,
+            "outputs": len(owners),
+            CREATED: stats.created,
+            UPDATED: stats.updated,
+            UNCHANGED: stats.unchanged,
+            "stale": len(stats.stale),
+            "pruned": stats.pruned,
+            "prune_skipped": prune_skipped,
+            "sources_per_second": round(len(sources) / elapsed, 1) if elapsed > 0 else None,
+        },
+        "collisions": collisions,
+        "stale": stats.stale,
+        "sources": results,
+    }
+
+
+def main():
+    """Main function to run the script."""
+    parser = argparse.ArgumentParser(description="Convert many rule source files to .mdc in parallel")
+    parser.add_argument("inputs", nargs="+", help="Source files, directories or glob patterns")
+    parser.add_argument("--output", "-o", default="mdc_rules", help="Output directory (default: mdc_rules)")
+    parser.add_argument("--format", "-f", choices=FORMATS, default="rules",
+                        help="rules: cursor_rules_convert format; blocks: rule_parser --- blocks (default: rules)")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--manifest", "-m", default="manifest.json", help="Manifest path (default: manifest.json)")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete .mdc files that earlier runs generated from these sources but this run did not")
+    args = parser.parse_args()
+
+    manifest = batch_convert(args.inputs, args.output, args.format, args.workers, args.prune)
+    if manifest["totals"]["sources"] == 0:
+        print("Error: No source files found.")
+        sys.exit(1)
+
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    totals = manifest["totals"]
+    print(f"Converted {totals['sources']} sources into {totals['outputs']} .mdc files "
+          f"in {manifest['seconds']}s ({totals['sources_per_second']} sources/s)")
+    print(f"created: {totals['created']}, updated: {totals['updated']}, unchanged: {totals['unchanged']}, "
+          f"stale: {totals['stale']}, failed: {totals['failed']}, collisions: {len(manifest['collisions'])}")
+    if totals["prune_skipped"]:
+        print(f"Warning: {totals['failed']} source(s) failed, so stale files were not pruned")
+    print(f"Manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Measure batch_convert throughput on generated rule sources.
+
+Usage:
+    python bench_batch_convert.py [--sources 5000] [--rules-per-source 5] [--workers 1 4 8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from batch_convert import batch_convert
+from cursor_rules_convert import extract_rule_parts
+
+
+def write_sources(source_dir, num_sources, rules_per_source, content_lines):
+    for i in range(num_sources):
+        rules = []
+        for j in range(rules_per_source):
+            body = "\n".join(f"- source {i} rule {j} guideline {k}" for k in range(content_lines))
+            rules.append(f"name: rule_{i}_{j}.mdc\ndescription: Rule {j} of source {i}\n"
+                         f"globs: src/module_{i}/**/*.py\n\n{body}\n")
+        with open(os.path.join(source_dir, f"source_{i}.txt"), "w", encoding="utf-8") as f:
+            f.write("---\n".join(rules))
+
+
+def bench_extract(content_lines):
+    """Time extract_rule_parts on a single very large rule."""
+    body = "\n".join(f"- guideline {k}: prefer explicit names" for k in range(content_lines))
+    rule = f"name: big.mdc\ndescription: big\nglobs: **/*.py\n\n{body}\n"
+    start = time.perf_counter()
+    extract_rule_parts(rule)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch_convert throughput")
+    parser.add_argument("--sources", type=int, default=5000, help="Number of source files")
+    parser.add_argument("--rules-per-source", type=int, default=5, help="Rules per source file")
+    parser.add_argument("--content-lines", type=int, default=20, help="Content lines per rule")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="Worker counts to compare")
+    args = parser.parse_args()
+
+    for lines in (10_000, 100_000):
+        print(f"extract_rule_parts on a {lines}-line rule: {bench_extract(lines):.3f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, "sources")
+        os.makedirs(source_dir)
+        write_sources(source_dir, args.sources, args.rules_per_source, args.content_lines)
+
+        print(f"{'workers':>8} {'run':>6} {'seconds':>9} {'sources/s':>10} {'rules/s':>9} "
+              f"{'created':>8} {'unchanged':>10}")
+        for workers in args.workers:
+            output_dir = os.path.join(tmp, f"out_{workers}")
+            for run in ("cold", "warm"):
+                manifest = batch_convert([source_dir], output_dir, "rules", workers)
+                totals = manifest["totals"]
+                rules_per_second = totals["outputs"] / manifest["seconds"] if manifest["seconds"] else 0
+                print(f"{workers:>8} {run:>6} {manifest['seconds']:>9.3f} {totals['sources_per_second']:>10} "
+                      f"{rules_per_second:>9.0f} {totals['created']:>8} {totals['unchanged']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""对比 /proc 扫描与 `ps aux` 子进程方式检测 Cursor 进程的耗时
+
+用法:
+    python bench_proc_scan.py [--runs 50] [--spawn 0]
+
+--spawn N 会先启动 N 个 sleep 子进程，模拟进程较多的主机。
+"""
+
+import argparse
+import os
+import subprocess
+import time
+
+import proc_scan
+
+
+def legacy_is_cursor_running():
+    """原 cursor_config_manager.is_cursor_running 的实现"""
+    output = subprocess.check_output(['ps', 'aux']).decode()
+    return 'cursor' in output.lower()
+
+
+def bench(label, func, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = func()
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"{label:<28} {elapsed * 1000:>10.3f} ms/次   结果: {result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='进程检测性能对比')
+    parser.add_argument('--runs', type=int, default=50, help='每种方式的运行次数 (默认: 50)')
+    parser.add_argument('--spawn', type=int, default=0, help='额外启动的 sleep 进程数 (默认: 0)')
+    args = parser.parse_args()
+
+    children = [subprocess.Popen(['sleep', '600']) for _ in range(args.spawn)]
+    try:
+        process_count = sum(1 for entry in os.listdir('/proc') if entry.isdigit())
+        print(f"当前进程数: {process_count}")
+        bench("ps aux + 子串匹配", legacy_is_cursor_running, args.runs)
+        bench("/proc 扫描 (无缓存)", lambda: proc_scan.is_running(ttl=0), args.runs)
+        bench("/proc 扫描 (TTL 缓存)", proc_scan.is_running, args.runs)
+    finally:
+        for child in children:
+            child.terminate()
+        for child in children:
+            child.wait()
+
+
+if __name__ == "__main__":
+    main()
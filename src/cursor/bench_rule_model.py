@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare memory of eager rule parsing with the lazy slotted rule model.
+
+Usage:
+    python bench_rule_model.py [--rules 50000] [--content-lines 20]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from cursor_rules_convert import extract_rule_parts
+from rule_model import RuleBuffer
+from rule_parser import iter_rule_blocks
+
+
+def generate_blocks(num_rules, content_lines):
+    parts = []
+    for i in range(num_rules):
+        parts.append(f"---\ndescription: generated rule {i}\nglobs: src/module_{i % 50}/**/*.py\n---\n")
+        parts.extend(f"- rule {i} line {j}: keep functions small and typed.\n" for j in range(content_lines))
+    return "".join(parts)
+
+
+def generate_sections(num_rules, content_lines):
+    rules = []
+    for i in range(num_rules):
+        body = "\n".join(f"- rule {i} line {j}: keep functions small and typed." for j in range(content_lines))
+        rules.append(f"name: rule_{i}.mdc\ndescription: generated rule {i}\nglobs: src/module_{i % 50}/**/*.py\n\n{body}\n")
+    return "---\n".join(rules)
+
+
+def measure(label, load, touch):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    load_seconds = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    touched = touch(result)
+    touch_seconds = time.perf_counter() - start
+    tracemalloc.stop()
+    print(f"{label:<32} {len(result):>8} {current / 1e6:>11.2f} {load_seconds:>8.3f} {touch_seconds:>9.3f} {touched:>8}")
+    del result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory of the lazy rule model")
+    parser.add_argument("--rules", type=int, default=50000, help="Number of generated rules")
+    parser.add_argument("--content-lines", type=int, default=20, help="Content lines per rule")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blocks_path = os.path.join(tmp, "blocks.txt")
+        sections_path = os.path.join(tmp, "sections.txt")
+        with open(blocks_path, "w", encoding="utf-8") as f:
+            f.write(generate_blocks(args.rules, args.content_lines))
+        with open(sections_path, "w", encoding="utf-8") as f:
+            f.write(generate_sections(args.rules, args.content_lines))
+
+        print(f"blocks source: {os.path.getsize(blocks_path) / 1e6:.2f} MB, "
+              f"sections source: {os.path.getsize(sections_path) / 1e6:.2f} MB")
+        print(f"{'loader':<32} {'rules':>8} {'retained MB':>11} {'load s':>8} {'filter s':>9} {'matches':>8}")
+
+        def count_module_7(rules):
+            return sum(1 for rule in rules if rule.globs.startswith("src/module_7/"))
+
+        def eager_blocks():
+            with open(blocks_path, "r", encoding="utf-8") as f:
+                return list(iter_rule_blocks(f))
+
+        measure("blocks: RuleBlock (eager)", eager_blocks,
+                lambda rules: sum(1 for r in rules if r.metadata.get("globs", "").startswith("src/module_7/")))
+
+        with RuleBuffer.open(blocks_path) as buffer:
+            measure("blocks: BlockRule (lazy, mmap)", lambda: list(buffer.rules("blocks")), count_module_7)
+
+        def eager_sections():
+            with open(sections_path, "r", encoding="utf-8") as f:
+                return [p for p in (extract_rule_parts(r) for r in f.read().split("---")) if p]
+
+        measure("rules: extract_rule_parts dicts", eager_sections,
+                lambda rules: sum(1 for r in rules if r["globs"].startswith("src/module_7/")))
+
+        with RuleBuffer.open(sections_path) as buffer:
+            measure("rules: SectionRule (lazy, mmap)", lambda: list(buffer.rules("rules")), count_module_7)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark the streaming rule tokenizer against the legacy DOTALL regex.
+
+Usage:
+    python bench_rule_parser.py [--blocks 2000 5000 20000] [--content-lines 20]
+"""
+import argparse
+import mmap
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+
+from rule_parser import iter_rule_blocks
+
+LEGACY_PATTERN = r'---\n(.*?)\n---\n(.*?)(?=(?:\n---\n)|$)'
+
+
+def legacy_parse(file_content):
+    """The regex implementation parse_rule_blocks used before the tokenizer."""
+    blocks = []
+    for match in re.finditer(LEGACY_PATTERN, file_content, re.DOTALL):
+        metadata = {}
+        for line in match.group(1).strip().split('\n'):
+            if ':' in line:
+                key, value = [x.strip() for x in line.split(':', 1)]
+                metadata[key] = value
+        blocks.append((metadata, match.group(2).strip()))
+    return blocks
+
+
+def generate_rules(num_blocks, content_lines):
+    """Generate a rule dump with num_blocks blocks."""
+    parts = []
+    for i in range(num_blocks):
+        parts.append('---\n')
+        parts.append(f'description: generated rule {i}\n')
+        parts.append(f'globs: src/module_{i % 50}/**/*.py\n')
+        parts.append('alwaysApply: false\n')
+        parts.append('---\n')
+        for j in range(content_lines):
+            parts.append(f'- rule {i} line {j}: keep functions small and typed.\n')
+    return ''.join(parts)
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark rule_parser tokenizer vs legacy regex')
+    parser.add_argument('--blocks', type=int, nargs='+', default=[2000, 5000, 20000],
+                        help='Number of rule blocks per generated input')
+    parser.add_argument('--content-lines', type=int, default=20,
+                        help='Content lines per rule block')
+    args = parser.parse_args()
+
+    print(f"{'blocks':>8} {'size MB':>8} {'impl':>10} {'seconds':>9} {'peak MB':>9} {'count':>7}")
+    for num_blocks in args.blocks:
+        text = generate_rules(num_blocks, args.content_lines)
+        size_mb = len(text.encode('utf-8')) / 1e6
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as tmp:
+            tmp.write(text)
+            path = tmp.name
+
+        try:
+            def run_regex():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return len(legacy_parse(f.read()))
+
+            def run_stream():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return sum(1 for _ in iter_rule_blocks(f))
+
+            def run_mmap():
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return sum(1 for _ in iter_rule_blocks(mm))
+
+            del text
+            for name, func in (('regex', run_regex), ('stream', run_stream), ('mmap', run_mmap)):
+                count, elapsed, peak = measure(func)
+                print(f"{num_blocks:>8} {size_mb:>8.1f} {name:>10} {elapsed:>9.3f} {peak / 1e6:>9.2f} {count:>7}")
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
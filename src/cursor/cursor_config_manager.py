@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import time
 
 # 检查 Python 版本
 if sys.version_info[0] < 3:
@@ -16,8 +15,13 @@ import argparse
 import hashlib
 import uuid
 import random
+import shutil
+import stat
 import string
-import subprocess
+import tempfile
+
+import json_scanner
+import proc_scan
 
 def get_config_path():
     """根据不同操作系统返回配置文件路径"""
@@ -32,18 +36,73 @@ def get_config_path():
 
 CONFIG_PATH = get_config_path()
 
+# 进程内解析缓存：(路径, mtime_ns, size) -> 已解析的配置
+_config_cache = {"key": None, "data": None}
+
+def _config_stat_key():
+    st = CONFIG_PATH.stat()
+    return (str(CONFIG_PATH), st.st_mtime_ns, st.st_size)
+
+def _invalidate_config_cache():
+    _config_cache["key"] = None
+    _config_cache["data"] = None
+
+def load_config():
+    """读取并解析配置文件，文件未变化（mtime/size）时直接返回缓存
+
+    返回的字典与缓存共享，修改后应通过 save_config 写回，失败时调用 _invalidate_config_cache
+    """
+    key = _config_stat_key()
+    if _config_cache["key"] != key:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            _config_cache["data"] = json.load(f)
+        _config_cache["key"] = key
+    return _config_cache["data"]
+
+def read_config_keys(keys):
+    """只读取指定的顶层键，不解析整个文件；扫描失败时回退到完整解析"""
+    try:
+        return json_scanner.read_keys(CONFIG_PATH, keys)
+    except (ValueError, UnicodeDecodeError):
+        data = load_config()
+        return {key: data[key] for key in keys if key in data}
+
+def save_config(data, backup=False):
+    """原子写入配置文件：写入同目录临时文件后重命名，可选保留 .bak 备份"""
+    CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if backup and CONFIG_PATH.exists():
+        shutil.copy2(CONFIG_PATH, CONFIG_PATH.with_name(CONFIG_PATH.name + ".bak"))
+
+    # mkstemp 创建的临时文件权限为 0600，替换前沿用原文件权限（新文件按 umask）
+    try:
+        mode = stat.S_IMODE(os.stat(CONFIG_PATH).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(prefix=CONFIG_PATH.name + ".", suffix=".tmp", dir=CONFIG_PATH.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, CONFIG_PATH)
+    except BaseException:
+        _invalidate_config_cache()
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    _config_cache["data"] = data
+    _config_cache["key"] = _config_stat_key()
+
 def is_cursor_running():
     """检查 Cursor 是否正在运行（不依赖第三方库）"""
     try:
-        if sys.platform == "win32":
-            # Windows
-            output = subprocess.check_output('tasklist', shell=True).decode()
-            return 'cursor' in output.lower()
-        else:
-            # Unix-like systems (Linux, macOS)
-            output = subprocess.check_output(['ps', 'aux']).decode()
-            return 'cursor' in output.lower()
-    except:
+        return proc_scan.is_running()
+    except Exception:
         return False  # 如果出错，假设进程未运行
 
 def check_cursor_process(func):
@@ -65,9 +124,8 @@ def show_config():
             print(f"配置文件不存在: {CONFIG_PATH}")
             return
         
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            print(json.dumps(data, indent=2, ensure_ascii=False))
+        data = load_config()
+        print(json.dumps(data, indent=2, ensure_ascii=False))
     except Exception as e:
         print(f"读取配置文件时出错: {str(e)}")
 
@@ -78,13 +136,11 @@ def get_value(key):
             print(f"配置文件不存在: {CONFIG_PATH}")
             return
         
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            value = data.get(key)
-            if value is None:
-                print(f"未找到键: {key}")
-            else:
-                print(json.dumps(value, indent=2, ensure_ascii=False))
+        value = read_config_keys([key]).get(key)
+        if value is None:
+            print(f"未找到键: {key}")
+        else:
+            print(json.dumps(value, indent=2, ensure_ascii=False))
     except Exception as e:
         print(f"读取配置文件时出错: {str(e)}")
 
@@ -95,38 +151,72 @@ def get_machine_ids():
             print(f"配置文件不存在: {CONFIG_PATH}")
             return
         
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            mac_id = data.get("telemetry.macMachineId", "未设置")
-            machine_id = data.get("telemetry.machineId", "未设置")
-            print(f"Mac配置: {mac_id}")
-            print(f"Windows配置: {machine_id}")
+        data = read_config_keys(["telemetry.macMachineId", "telemetry.machineId"])
+        mac_id = data.get("telemetry.macMachineId", "未设置")
+        machine_id = data.get("telemetry.machineId", "未设置")
+        print(f"Mac配置: {mac_id}")
+        print(f"Windows配置: {machine_id}")
     except Exception as e:
         print(f"读取配置文件时出错: {str(e)}")
 
+def parse_value(value):
+    """尝试将输入的值转换为 JSON，不是有效 JSON 时按字符串处理"""
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+MUTATING_OPS = ("set", "delete")
+
+def apply_operations(operations, backup=False):
+    """在一次读取和一次写入中依次执行 get/set/delete 操作
+
+    operations 为 {"op": "get"|"set"|"delete", "key": ..., "value": ...} 列表，
+    返回每个操作的结果列表。只要有修改，整批操作在最后原子写入一次。
+    """
+    if CONFIG_PATH.exists():
+        data = load_config()
+    else:
+        data = {}
+
+    results = []
+    changed = False
+    try:
+        for operation in operations:
+            op = operation.get("op")
+            key = operation.get("key")
+            if op not in ("get",) + MUTATING_OPS or not isinstance(key, str):
+                raise ValueError(f"无效的操作: {operation}")
+
+            if op == "get":
+                results.append({"op": op, "key": key, "found": key in data, "value": data.get(key)})
+            elif op == "set":
+                if "value" not in operation:
+                    raise ValueError(f"set 操作缺少 value: {operation}")
+                data[key] = operation["value"]
+                changed = True
+                results.append({"op": op, "key": key, "value": operation["value"]})
+            else:
+                found = key in data
+                data.pop(key, None)
+                changed = changed or found
+                results.append({"op": op, "key": key, "found": found})
+
+        if changed:
+            save_config(data, backup=backup)
+    except BaseException:
+        # 内存中的缓存可能已被部分修改，丢弃它
+        _invalidate_config_cache()
+        raise
+
+    return results
+
 @check_cursor_process
 def set_value(key, value):
     """设置指定键的值"""
     try:
-        data = {}
-        if CONFIG_PATH.exists():
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        
-        # 尝试将输入的值转换为 JSON
-        try:
-            value = json.loads(value)
-        except json.JSONDecodeError:
-            # 如果不是有效的 JSON，就按字符串处理
-            pass
-        
-        data[key] = value
-        
-        # 确保目录存在
-        CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        value = parse_value(value)
+        apply_operations([{"op": "set", "key": key, "value": value}])
         print(f"已设置 {key} = {value}")
     except Exception as e:
         print(f"设置值时出错: {str(e)}")
@@ -139,15 +229,11 @@ def reset_machine_ids():
             print(f"配置文件不存在: {CONFIG_PATH}")
             return
         
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         # 删除配置ID
-        data.pop("telemetry.macMachineId", None)
-        data.pop("telemetry.machineId", None)
-        
-        with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        apply_operations([
+            {"op": "delete", "key": "telemetry.macMachineId"},
+            {"op": "delete", "key": "telemetry.machineId"},
+        ])
         print("已成功重置配置信息")
     except Exception as e:
         print(f"重置配置信息时出错: {str(e)}")
@@ -166,41 +252,35 @@ def generate_random_machine_ids():
             random_str += str(uuid.uuid4())  # 添加 UUID 增加随机性
             return hashlib.sha256(random_str.encode()).hexdigest()
         
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         # 生成新的配置
-        data["telemetry.macMachineId"] = generate_random_hash()
-        data["telemetry.machineId"] = generate_random_hash()
-        
-        with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        mac_id = generate_random_hash()
+        machine_id = generate_random_hash()
+        apply_operations([
+            {"op": "set", "key": "telemetry.macMachineId", "value": mac_id},
+            {"op": "set", "key": "telemetry.machineId", "value": machine_id},
+        ])
         
         print("已生成新的配置：")
-        print(f"Mac配置: {data['telemetry.macMachineId']}")
-        print(f"Windows配置: {data['telemetry.machineId']}")
+        print(f"Mac配置: {mac_id}")
+        print(f"Windows配置: {machine_id}")
     except Exception as e:
         print(f"生成配置时出错: {str(e)}")
 
 def kill_cursor_processes():
     """终止所有 Cursor 相关进程"""
     try:
-        if sys.platform == "win32":
-            # Windows
-            subprocess.run(['taskkill', '/F', '/IM', 'Cursor.exe'], check=False)
-        else:
-            # Unix-like systems (Linux, macOS)
-            try:
-                # 先尝试正常终止
-                subprocess.run(['pkill', 'Cursor'], check=False)
-                # 等待一小段时间
-                time.sleep(1)
-                # 如果还有进程存在，强制终止
-                subprocess.run(['pkill', '-9', 'Cursor'], check=False)
-            except Exception as e:
-                print(f"终止进程时出错: {str(e)}")
-        
-        print("已尝试终止所有 Cursor 进程")
+        pids = proc_scan.find_processes(ttl=0)
+        if not pids:
+            print("未发现正在运行的 Cursor 进程")
+            return
+
+        # 先正常终止并等待进程退出，超时后强制终止
+        result = proc_scan.terminate(pids)
+        print(f"已终止 Cursor 进程: {result['terminated'] + result['killed']}")
+        if result["killed"]:
+            print(f"以下进程未响应正常终止，已强制结束: {result['killed']}")
+        if result["remaining"]:
+            print(f"以下进程仍在运行: {result['remaining']}")
     except Exception as e:
         print(f"终止进程时出错: {str(e)}")
 
@@ -218,7 +298,70 @@ def show_menu():
     print("========================")
     return input("请选择操作 (0-7): ")
 
+class _OperationAction(argparse.Action):
+    """按命令行顺序收集 --get/--set/--delete 操作"""
+    def __call__(self, parser, namespace, values, option_string=None):
+        operations = getattr(namespace, self.dest, None) or []
+        op = option_string.lstrip('-')
+        if op == "set":
+            if '=' not in values:
+                parser.error(f"--set 需要 KEY=VALUE 格式: {values}")
+            key, value = values.split('=', 1)
+            operations.append({"op": op, "key": key, "value": parse_value(value)})
+        else:
+            operations.append({"op": op, "key": values})
+        setattr(namespace, self.dest, operations)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Cursor 配置管理工具，不带参数时进入交互菜单')
+    parser.add_argument('--get', dest='operations', action=_OperationAction, metavar='KEY',
+                        help='读取键的值（可重复）')
+    parser.add_argument('--set', dest='operations', action=_OperationAction, metavar='KEY=VALUE',
+                        help='设置键的值，VALUE 优先按 JSON 解析（可重复）')
+    parser.add_argument('--delete', dest='operations', action=_OperationAction, metavar='KEY',
+                        help='删除键（可重复）')
+    parser.add_argument('--ops', metavar='FILE',
+                        help='从 JSON 文件读取操作列表，- 表示标准输入')
+    parser.add_argument('--backup', action='store_true', help='写入前保留 storage.json.bak 备份')
+    parser.add_argument('--force', action='store_true', help='Cursor 正在运行时也执行修改')
+    return parser.parse_args()
+
+def run_batch(args):
+    """非交互模式：一次读取、一次写入执行所有操作，并以 JSON 输出结果"""
+    operations = list(args.operations or [])
+    if args.ops:
+        try:
+            if args.ops == '-':
+                loaded = json.load(sys.stdin)
+            else:
+                with open(args.ops, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取操作文件时出错: {str(e)}", file=sys.stderr)
+            return 1
+        if not isinstance(loaded, list) or not all(isinstance(op, dict) for op in loaded):
+            print("错误: 操作文件必须是由对象组成的 JSON 数组", file=sys.stderr)
+            return 1
+        operations.extend(loaded)
+
+    if any(op.get("op") in MUTATING_OPS for op in operations) and not args.force and is_cursor_running():
+        print("错误: 检测到 Cursor 正在运行，修改可能会被覆盖。使用 --force 强制执行。", file=sys.stderr)
+        return 1
+
+    try:
+        results = apply_operations(operations, backup=args.backup)
+    except Exception as e:
+        print(f"执行操作时出错: {str(e)}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return 0
+
 def main():
+    args = parse_arguments()
+    if args.operations or args.ops:
+        sys.exit(run_batch(args))
+
     while True:
         choice = show_menu()
         
@@ -1,24 +1,33 @@
 #!/usr/bin/env python3
+import argparse
 import os
 import re
 import sys
 
+from mdc_writer import OutputManifest, WriteStats, write_if_changed
+
+
+NAME_PATTERN = re.compile(r'name:\s*(.*?)\.mdc', re.DOTALL)
+DESCRIPTION_PATTERN = re.compile(r'description:\s*(.*?)(?:\n|$)', re.DOTALL)
+GLOBS_PATTERN = re.compile(r'globs:\s*(.*?)(?:\n|$)', re.DOTALL)
+METADATA_LINE_PATTERN = re.compile(r'^\s*(name|description|globs):', re.IGNORECASE)
+
 
 def extract_rule_parts(rule_text):
     """Extract name, description, globs and content from a rule text."""
     # Extract name using regex
-    name_match = re.search(r'name:\s*(.*?)\.mdc', rule_text, re.DOTALL)
+    name_match = NAME_PATTERN.search(rule_text)
     if not name_match:
         return None
 
     name = name_match.group(1).strip()
 
     # Extract description
-    desc_match = re.search(r'description:\s*(.*?)(?:\n|$)', rule_text, re.DOTALL)
+    desc_match = DESCRIPTION_PATTERN.search(rule_text)
     description = desc_match.group(1).strip() if desc_match else ""
 
     # Extract globs
-    globs_match = re.search(r'globs:\s*(.*?)(?:\n|$)', rule_text, re.DOTALL)
+    globs_match = GLOBS_PATTERN.search(rule_text)
     globs = globs_match.group(1).strip() if globs_match else ""
 
     # Extract content (everything after the header patterns)
@@ -27,28 +36,28 @@ def extract_rule_parts(rule_text):
     
     # Clean content by removing name, description, and globs lines
     # but preserving them inside frontmatter
-    cleaned_content = ""
+    cleaned_lines = []
     in_frontmatter = False
     
     for line in content.split('\n'):
         # Check if we're entering frontmatter
         if line.strip() == "---":
             in_frontmatter = not in_frontmatter
-            cleaned_content += line + "\n"
+            cleaned_lines.append(line)
             continue
             
         # If we're in frontmatter, keep all lines
         if in_frontmatter:
-            cleaned_content += line + "\n"
+            cleaned_lines.append(line)
         # If we're outside frontmatter, filter out metadata lines
-        elif not re.match(r'^\s*(name|description|globs):', line, re.IGNORECASE):
-            cleaned_content += line + "\n"
+        elif not METADATA_LINE_PATTERN.match(line):
+            cleaned_lines.append(line)
     
     return {
         "name": name,
         "description": description,
         "globs": globs,
-        "content": cleaned_content.strip()
+        "content": "\n".join(cleaned_lines).strip()
     }
 
 
@@ -67,27 +76,27 @@ globs: {rule_parts['globs']}
     return mdc_content
 
 
-def save_to_file(name, content, output_dir="."):
-    """Save the content to a file in the specified directory."""
+def save_to_file(name, content, output_dir=".", stats=None):
+    """Save the content to a file in the specified directory.
+
+    The file is only rewritten (atomically) when its content changed.
+    """
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
 
     # Create file path
     file_path = os.path.join(output_dir, f"{name}.mdc")
 
-    # Write content to file
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    # Write content to file if it differs from what is on disk
+    status = write_if_changed(file_path, content)
+    if stats is not None:
+        stats.record(file_path, status)
 
     return file_path
 
 
-def process_rules_file(input_file, output_dir="."):
-    """Process the input file and create individual .mdc files."""
-    # Read input file
-    with open(input_file, "r", encoding="utf-8") as f:
-        content = f.read()
-
+def convert_rules(content, output_dir=".", stats=None, verbose=True):
+    """Convert the rules in content to .mdc files and return their paths."""
     # Split by section divider
     rules = content.split("---")
 
@@ -99,25 +108,69 @@ def process_rules_file(input_file, output_dir="."):
 
         rule_parts = extract_rule_parts(rule)
         if not rule_parts:
-            print(f"Warning: Could not extract rule parts from:\n{rule}")
+            if verbose:
+                print(f"Warning: Could not extract rule parts from:\n{rule}")
             continue
 
         mdc_content = format_mdc_file(rule_parts)
         if not mdc_content:
             continue
 
-        file_path = save_to_file(rule_parts["name"], mdc_content, output_dir)
+        file_path = save_to_file(rule_parts["name"], mdc_content, output_dir, stats)
         created_files.append(file_path)
-        print(f"Created: {file_path}")
 
     return created_files
 
 
+def process_rules_file(input_file, output_dir=".", prune=False):
+    """Process the input file and create individual .mdc files.
+
+    Reports created/updated/unchanged/stale counts. Stale files are ones an
+    earlier run generated from input_file that this run did not; with
+    prune=True they are deleted. Other .mdc files in output_dir are untouched.
+    """
+    # Read input file
+    with open(input_file, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    stats = WriteStats()
+    created_files = convert_rules(content, output_dir, stats)
+
+    if os.path.isdir(output_dir):
+        manifest = OutputManifest(output_dir)
+        stats.find_stale(manifest, [input_file])
+        if prune:
+            stats.prune()
+        stats.update_manifest(manifest, input_file, stats.produced)
+        manifest.save()
+    print(f"Summary - {stats.summary()}")
+
+    return created_files
+
+
+def parse_arguments():
+    """Parse command line arguments, prompting for anything not provided."""
+    parser = argparse.ArgumentParser(description="Convert custom rule formats to .mdc files")
+    parser.add_argument("--input", "-i", default=None, help="Input rules file")
+    parser.add_argument("--output", "-o", default=None, help="Output directory (default: mdc_rules)")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete .mdc files that earlier runs generated from this input but this run did not")
+    args = parser.parse_args()
+
+    if args.input is None:
+        args.input = input("Please enter the input file path: ").strip()
+    if args.output is None:
+        args.output = input("Please enter the output directory path (default: mdc_rules): ").strip()
+
+    return args
+
+
 def main():
     """Main function to run the script."""
-    input_file = input("Please enter the input file path: ").strip()
-    output_dir = input("Please enter the output directory path (default: mdc_rules): ").strip()
-    
+    args = parse_arguments()
+    input_file = args.input
+    output_dir = args.output
+
     # Use default output directory if user input is empty
     if not output_dir:
         output_dir = "mdc_rules"
@@ -127,8 +180,8 @@ def main():
         sys.exit(1)
 
     print(f"Processing {input_file}...")
-    created_files = process_rules_file(input_file, output_dir)
-    print(f"Successfully created {len(created_files)} .mdc files in '{output_dir}'.")
+    created_files = process_rules_file(input_file, output_dir, prune=args.prune)
+    print(f"Successfully generated {len(created_files)} .mdc files in '{output_dir}'.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""按需读取大型 JSON 对象的顶层键，无需 json.load 整个文件
+
+扫描器通过 mmap 顺序遍历顶层对象，只记录每个顶层键对应值的字节区间，
+嵌套的对象、数组和字符串借助正则直接跳过，不会构建任何 Python 对象。
+键 -> 字节偏移索引以 JSON 形式缓存在 ~/.cache/cursor_config_manager/ 下，
+并以文件的 mtime 和大小作为失效条件，重复查询只需读取并解码目标值。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+from pathlib import Path
+
+INDEX_VERSION = 1
+INDEX_DIR = Path(os.path.expanduser("~/.cache/cursor_config_manager"))
+
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+# 整个字符串（含转义）或单个括号，字符串在正则引擎内一次跳过
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+_SCALAR_END = re.compile(rb'[,}\]\s]')
+_BACKSLASH = 0x5C
+_QUOTE = 0x22
+_OPENERS = (0x5B, 0x7B)
+
+# 进程内缓存：路径 -> (mtime_ns, size, {键: [起始, 结束]})
+_memory_index = {}
+
+
+def _skip_whitespace(buf, pos):
+    return _WHITESPACE.match(buf, pos).end()
+
+
+def _skip_string(buf, pos):
+    """pos 指向开头的引号，返回结尾引号之后的位置"""
+    i = pos + 1
+    while True:
+        end = buf.find(b'"', i)
+        if end == -1:
+            raise ValueError(f"字符串未结束，起始位置 {pos}")
+        # 统计引号前连续的反斜杠，奇数个表示引号被转义
+        k = end - 1
+        while k > pos and buf[k] == _BACKSLASH:
+            k -= 1
+        if (end - 1 - k) % 2 == 0:
+            return end + 1
+        i = end + 1
+
+
+def _skip_value(buf, pos):
+    """跳过 pos 处的任意 JSON 值，返回其结束位置"""
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        return _skip_string(buf, pos)
+
+    if first in (b'{', b'['):
+        depth = 0
+        for match in _TOKEN.finditer(buf, pos):
+            char = buf[match.start()]
+            if char == _QUOTE:
+                continue
+            depth += 1 if char in _OPENERS else -1
+            if depth == 0:
+                return match.end()
+        raise ValueError(f"对象或数组未结束，起始位置 {pos}")
+
+    match = _SCALAR_END.search(buf, pos)
+    return match.start() if match else len(buf)
+
+
+def scan_top_level(buf):
+    """扫描顶层对象，返回 {键: [值起始偏移, 值结束偏移]}"""
+    index = {}
+    pos = _skip_whitespace(buf, 0)
+    if buf[pos:pos + 1] != b'{':
+        raise ValueError("顶层不是 JSON 对象")
+    pos = _skip_whitespace(buf, pos + 1)
+    if buf[pos:pos + 1] == b'}':
+        return index
+
+    while True:
+        if buf[pos:pos + 1] != b'"':
+            raise ValueError(f"位置 {pos} 处应为键")
+        key_end = _skip_string(buf, pos)
+        key = json.loads(bytes(buf[pos:key_end]).decode('utf-8'))
+
+        pos = _skip_whitespace(buf, key_end)
+        if buf[pos:pos + 1] != b':':
+            raise ValueError(f"位置 {pos} 处应为冒号")
+        value_start = _skip_whitespace(buf, pos + 1)
+        value_end = _skip_value(buf, value_start)
+        # 重复键与 json.load 一致，以最后一次出现为准
+        index[key] = [value_start, value_end]
+
+        pos = _skip_whitespace(buf, value_end)
+        separator = buf[pos:pos + 1]
+        if separator == b'}':
+            return index
+        if separator != b',':
+            raise ValueError(f"位置 {pos} 处应为逗号或右括号")
+        pos = _skip_whitespace(buf, pos + 1)
+
+
+def _index_path(path):
+    digest = hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()
+    return INDEX_DIR / f"{digest}.json"
+
+
+def _load_persisted_index(path, mtime_ns, size):
+    try:
+        with open(_index_path(path), 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (stored.get("version") != INDEX_VERSION or stored.get("mtime_ns") != mtime_ns
+            or stored.get("size") != size):
+        return None
+    return stored["keys"]
+
+
+def _save_persisted_index(path, mtime_ns, size, index):
+    try:
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".index.", suffix=".tmp", dir=INDEX_DIR)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "path": str(path), "mtime_ns": mtime_ns,
+                       "size": size, "keys": index}, f, ensure_ascii=False)
+        os.replace(tmp_path, _index_path(path))
+    except OSError:
+        # 索引只是加速手段，写入失败不影响查询
+        pass
+
+
+def get_key_index(path):
+    """返回文件的顶层键索引，优先使用进程内缓存和磁盘索引"""
+    stat = os.stat(path)
+    mtime_ns, size = stat.st_mtime_ns, stat.st_size
+    key = str(path)
+
+    cached = _memory_index.get(key)
+    if cached and cached[0] == mtime_ns and cached[1] == size:
+        return cached[2]
+
+    index = _load_persisted_index(path, mtime_ns, size)
+    if index is None:
+        with open(path, 'rb') as f:
+            if size == 0:
+                raise ValueError("配置文件为空")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                index = scan_top_level(buf)
+        _save_persisted_index(path, mtime_ns, size, index)
+
+    _memory_index[key] = (mtime_ns, size, index)
+    return index
+
+
+def read_keys(path, keys):
+    """读取指定顶层键的值，返回 {键: 值}，不存在的键不会出现在结果中"""
+    index = get_key_index(path)
+    values = {}
+    with open(path, 'rb') as f:
+        for key in keys:
+            span = index.get(key)
+            if span is None:
+                continue
+            start, end = span
+            f.seek(start)
+            values[key] = json.loads(f.read(end - start).decode('utf-8'))
+    return values
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Incremental, atomic writing of generated .mdc files.
+
+Both rule converters regenerate every rule on each run. Writing only the files
+whose content actually changed keeps editor file watchers and indexers quiet,
+and the temp-file-plus-rename write never leaves a half-written rule behind.
+
+Each output directory keeps a small manifest (.mdc-manifest.json) of the
+files every source generated there. Only those files can be reported as stale
+or pruned, so hand-written rules and other sources' outputs are left alone.
+"""
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+MANIFEST_NAME = ".mdc-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(data):
+    """Return the SHA-256 hex digest of bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 16):
+    """Return the SHA-256 hex digest of a file on disk, or None if it is missing."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _target_mode(path):
+    """Mode the written file should end up with: the existing file's, else the umask default."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write(path, data):
+    """Write bytes to path via a temp file in the same directory and os.replace.
+
+    mkstemp creates the temp file as 0600, so the existing file's mode (or the
+    umask-derived default for new files) is applied before the rename.
+    """
+    path = Path(path)
+    mode = _target_mode(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_if_changed(path, content, encoding="utf-8"):
+    """Write content only if it differs from the file on disk.
+
+    Returns one of CREATED, UPDATED or UNCHANGED.
+    """
+    data = content.encode(encoding)
+    existing = file_hash(path)
+    if existing == content_hash(data):
+        return UNCHANGED
+
+    atomic_write(path, data)
+    return CREATED if existing is None else UPDATED
+
+
+class OutputManifest:
+    """The .mdc files each source generated in an output directory.
+
+    Sources are keyed by absolute path; files are stored by name relative to
+    the directory. A missing or unreadable manifest starts empty.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.sources = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION and isinstance(data.get("sources"), dict):
+            self.sources = {source: [name for name in names if isinstance(name, str)]
+                            for source, names in data["sources"].items() if isinstance(names, list)}
+
+    def generated(self, source):
+        """Paths of the files recorded as generated from source."""
+        return [str(self.output_dir / name) for name in self.sources.get(os.path.abspath(source), [])]
+
+    def owners(self, path):
+        """Sources that list path as one of their outputs."""
+        name = os.path.basename(path)
+        return [source for source, names in self.sources.items() if name in names]
+
+    def record(self, source, paths):
+        """Replace the entry for source with paths."""
+        self.sources[os.path.abspath(source)] = sorted({os.path.basename(p) for p in paths})
+
+    def save(self):
+        data = {"version": MANIFEST_VERSION, "sources": self.sources}
+        atomic_write(self.path, json.dumps(data, indent=2, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+
+class WriteStats:
+    """Counts of what a converter run did to its output directory."""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.stale = []
+        self.pruned = 0
+        self.produced = set()
+
+    def record(self, path, status):
+        self.produced.add(os.path.abspath(path))
+        setattr(self, status, getattr(self, status) + 1)
+
+    def find_stale(self, manifest, sources):
+        """Collect files generated from sources by earlier runs that this run did not produce.
+
+        Candidates come from the manifest only, and a file still claimed by a
+        source outside this run is skipped.
+        """
+        keys = {os.path.abspath(source) for source in sources}
+        self.stale = sorted({
+            path for source in sources for path in manifest.generated(source)
+            if os.path.abspath(path) not in self.produced
+            and os.path.exists(path)
+            and keys.issuperset(manifest.owners(path))
+        })
+        return self.stale
+
+    def update_manifest(self, manifest, source, outputs):
+        """Record source's outputs; its stale files stay listed until they are pruned."""
+        stale = set(self.stale)
+        kept = [path for path in manifest.generated(source) if path in stale and os.path.exists(path)]
+        manifest.record(source, list(outputs) + kept)
+
+    def prune(self):
+        """Delete the stale files found by find_stale()."""
+        for path in self.stale:
+            try:
+                os.remove(path)
+                self.pruned += 1
+            except FileNotFoundError:
+                pass
+        return self.pruned
+
+    def summary(self):
+        text = (f"created: {self.created}, updated: {self.updated}, "
+                f"unchanged: {self.unchanged}, stale: {len(self.stale)}")
+        if self.pruned:
+            text += f", pruned: {self.pruned}"
+        return text
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""不依赖第三方库的进程检测与终止
+
+Linux 上直接扫描 /proc/<pid>/comm 和 cmdline，按可执行文件名精确匹配（忽略大小写），
+避免 fork `ps aux` 以及子串匹配误判命令行中包含 "cursor" 的无关进程。
+其他系统回退到 `ps -axo pid=,comm=` 或 `tasklist`。查询结果带短 TTL 缓存，
+终止进程时按 PID 发送 SIGTERM 并轮询等待，超时后再 SIGKILL。
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+
+CURSOR_NAMES = ("cursor", "cursor.exe")
+CACHE_TTL = 2.0
+
+# 进程名集合 -> (查询时间, PID 列表)
+_cache = {}
+
+
+def _read_bytes(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _linux_process_matches(pid, names):
+    """comm 或 argv[0] 的文件名与 names 精确匹配"""
+    comm = _read_bytes(f"/proc/{pid}/comm")
+    if comm is None:
+        return False
+    if comm.strip().decode('utf-8', 'replace').lower() in names:
+        return True
+
+    # comm 最长 15 个字符，且部分启动器会改写它，再检查 argv[0]
+    cmdline = _read_bytes(f"/proc/{pid}/cmdline")
+    if not cmdline:
+        return False
+    argv0 = cmdline.split(b'\0', 1)[0].decode('utf-8', 'replace')
+    return os.path.basename(argv0).lower() in names
+
+
+def _find_linux(names):
+    own_pid = os.getpid()
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        if pid != own_pid and _linux_process_matches(pid, names) and pid_alive(pid):
+            pids.append(pid)
+    return pids
+
+
+def _find_ps(names):
+    output = subprocess.check_output(['ps', '-axo', 'pid=,comm=']).decode('utf-8', 'replace')
+    pids = []
+    for line in output.splitlines():
+        parts = line.strip().split(None, 1)
+        if len(parts) == 2 and os.path.basename(parts[1]).lower() in names:
+            pids.append(int(parts[0]))
+    return pids
+
+
+def _find_windows(names):
+    output = subprocess.check_output(['tasklist', '/FO', 'CSV', '/NH']).decode('utf-8', 'replace')
+    pids = []
+    for line in output.splitlines():
+        fields = [field.strip('"') for field in line.split('","')]
+        if len(fields) >= 2 and fields[0].lower() in names and fields[1].isdigit():
+            pids.append(int(fields[1]))
+    return pids
+
+
+def find_processes(names=CURSOR_NAMES, ttl=CACHE_TTL):
+    """返回名称精确匹配的进程 PID 列表，ttl 秒内重复查询直接使用缓存"""
+    names = frozenset(name.lower() for name in names)
+    now = time.monotonic()
+    cached = _cache.get(names)
+    if cached and ttl > 0 and now - cached[0] < ttl:
+        return list(cached[1])
+
+    if sys.platform == "win32":
+        pids = _find_windows(names)
+    elif os.path.isdir('/proc/self'):
+        pids = _find_linux(names)
+    else:
+        pids = _find_ps(names)
+
+    _cache[names] = (now, pids)
+    return list(pids)
+
+
+def invalidate_cache():
+    _cache.clear()
+
+
+def is_running(names=CURSOR_NAMES, ttl=CACHE_TTL):
+    return bool(find_processes(names, ttl))
+
+
+def pid_alive(pid):
+    """进程是否仍存在（Linux 上僵尸进程视为已退出）"""
+    if sys.platform == "win32":
+        output = subprocess.check_output(['tasklist', '/FI', f'PID eq {pid}', '/FO', 'CSV', '/NH'])
+        return str(pid).encode() in output
+
+    stat = _read_bytes(f"/proc/{pid}/stat")
+    if stat is not None:
+        # 格式: pid (comm) state ...，comm 中可能含括号，取最后一个右括号之后的状态
+        return stat[stat.rfind(b')') + 2:stat.rfind(b')') + 3] != b'Z'
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _signal(pid, sig):
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _wait_for_exit(pids, timeout, poll_interval):
+    deadline = time.monotonic() + timeout
+    remaining = [pid for pid in pids if pid_alive(pid)]
+    while remaining and time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        remaining = [pid for pid in remaining if pid_alive(pid)]
+    return remaining
+
+
+def terminate(pids, timeout=3.0, kill_timeout=1.0, poll_interval=0.05):
+    """按 PID 终止进程：先正常终止并等待，超时后强制终止
+
+    返回 {"terminated": [...], "killed": [...], "remaining": [...]}
+    """
+    pids = list(pids)
+    if sys.platform == "win32":
+        for pid in pids:
+            subprocess.run(['taskkill', '/PID', str(pid)], check=False, capture_output=True)
+        remaining = _wait_for_exit(pids, timeout, poll_interval)
+        for pid in remaining:
+            subprocess.run(['taskkill', '/F', '/PID', str(pid)], check=False, capture_output=True)
+    else:
+        for pid in pids:
+            _signal(pid, signal.SIGTERM)
+        remaining = _wait_for_exit(pids, timeout, poll_interval)
+        for pid in remaining:
+            _signal(pid, signal.SIGKILL)
+
+    still_alive = _wait_for_exit(remaining, kill_timeout, poll_interval)
+    invalidate_cache()
+    return {
+        "terminated": [pid for pid in pids if pid not in remaining],
+        "killed": [pid for pid in remaining if pid not in still_alive],
+        "remaining": still_alive,
+    }
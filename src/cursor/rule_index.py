@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""Compiled glob index answering "which .mdc rules apply to this path".
+
+All .mdc files in a rules directory are loaded once and their `globs`
+frontmatter is compiled into a combined matcher:
+
+- extension globs (`*.py`, `**/*.ts`) go into a suffix table,
+- directory globs (`src/api/**`, `src/**/*.py`) go into a path-segment trie,
+- everything else is translated to regexes, guarded by one merged regex so
+  paths that match none of them are rejected with a single call.
+
+The parsed rule globs are cached as JSON under ~/.cache/cursor_rule_index/ and
+recompiled from there until any .mdc file changes, so the .mdc files are not
+re-read on every run. Globs without a `/` match at any depth, as in .gitignore.
+
+Usage:
+    git ls-files | python rule_index.py .cursor/rules
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+INDEX_VERSION = 2
+CACHE_DIR = Path(os.path.expanduser("~/.cache/cursor_rule_index"))
+
+FRONTMATTER_PATTERN = re.compile(r'\A---\r?\n(.*?)\r?\n---', re.DOTALL)
+GLOBS_PATTERN = re.compile(r'^globs:[ \t]*(.*)$', re.MULTILINE)
+ALWAYS_APPLY_PATTERN = re.compile(r'^alwaysApply:[ \t]*(\S+)', re.MULTILINE)
+BRACE_PATTERN = re.compile(r'\{([^{}]*)\}')
+EXT_GLOB_PATTERN = re.compile(r'^\*(\.[^*?\[\]{}/]+)$')
+MAGIC_CHARS = set('*?[')
+
+
+def read_rule_globs(path):
+    """Return (globs, always_apply) from an .mdc file's frontmatter."""
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(8192)
+    match = FRONTMATTER_PATTERN.match(head)
+    if not match:
+        return [], False
+
+    frontmatter = match.group(1)
+    always = ALWAYS_APPLY_PATTERN.search(frontmatter)
+    always_apply = bool(always) and always.group(1).lower() == "true"
+
+    globs_match = GLOBS_PATTERN.search(frontmatter)
+    if not globs_match:
+        return [], always_apply
+    return split_globs(globs_match.group(1)), always_apply
+
+
+def split_globs(value):
+    """Split a globs value (`a, b`, `[a, b]` or quoted) on top-level commas."""
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        value = value[1:-1]
+
+    globs, depth, current = [], 0, []
+    for char in value:
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth = max(depth - 1, 0)
+        if char == "," and depth == 0:
+            globs.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    globs.append("".join(current))
+
+    return [g.strip().strip("'\"").strip() for g in globs if g.strip().strip("'\"").strip()]
+
+
+def expand_braces(glob):
+    """Expand `{a,b}` alternatives into separate globs."""
+    match = BRACE_PATTERN.search(glob)
+    if not match:
+        return [glob]
+    head, tail = glob[:match.start()], glob[match.end():]
+    expanded = []
+    for option in match.group(1).split(","):
+        expanded.extend(expand_braces(head + option + tail))
+    return expanded
+
+
+def normalize_glob(glob):
+    """Anchor a glob to the repository root; globs without `/` match at any depth."""
+    if glob.startswith("./"):
+        glob = glob[2:]
+    glob = glob.lstrip("/")
+    if glob.endswith("/"):
+        glob += "**"
+    if "/" not in glob:
+        glob = "**/" + glob
+    return glob
+
+
+def translate_glob(glob):
+    """Translate a normalized glob to a regex source string (no anchors)."""
+    i, n, out = 0, len(glob), []
+    while i < n:
+        char = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == n:
+            out.append("(?:/.*)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif char == "*":
+            out.append("[^/]*")
+            i += 1
+        elif char == "?":
+            out.append("[^/]")
+            i += 1
+        elif char == "[":
+            end = glob.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(char))
+                i += 1
+                continue
+            body = glob[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(char))
+            i += 1
+    return "".join(out)
+
+
+def is_literal(segment):
+    return not (MAGIC_CHARS & set(segment))
+
+
+class _TrieNode:
+    __slots__ = ("children", "rules", "ext_rules")
+
+    def __init__(self):
+        self.children = {}
+        self.rules = set()
+        self.ext_rules = {}
+
+
+class RuleIndex:
+    """Combined glob matcher over a set of rules."""
+
+    def __init__(self):
+        self.rule_names = []
+        self.rules = []
+        self.always_rules = set()
+        self.match_all = set()
+        self.ext_rules = {}
+        self.trie = _TrieNode()
+        self.residual = []
+        self.merged = None
+        self.signature = None
+
+    # Building
+
+    def add_rule(self, name, globs, always_apply=False):
+        rule_id = len(self.rule_names)
+        self.rule_names.append(name)
+        self.rules.append((name, list(globs), bool(always_apply)))
+        if always_apply:
+            self.always_rules.add(rule_id)
+        for glob in globs:
+            for expanded in expand_braces(glob):
+                self._add_glob(rule_id, normalize_glob(expanded))
+
+    def _add_glob(self, rule_id, glob):
+        segments = glob.split("/")
+
+        # Literal directory prefix
+        prefix = []
+        while segments and is_literal(segments[0]) and len(segments) > 1:
+            prefix.append(segments.pop(0))
+        rest = "/".join(segments)
+
+        ext = None
+        if rest in ("**", "**/*"):
+            ext = ""
+        elif rest.startswith("**/"):
+            ext_match = EXT_GLOB_PATTERN.match(rest[3:])
+            if ext_match:
+                ext = ext_match.group(1)
+
+        if ext is not None:
+            if not prefix:
+                if ext:
+                    self.ext_rules.setdefault(ext, set()).add(rule_id)
+                else:
+                    self.match_all.add(rule_id)
+                return
+            node = self.trie
+            for segment in prefix:
+                node = node.children.setdefault(segment, _TrieNode())
+            if ext:
+                node.ext_rules.setdefault(ext, set()).add(rule_id)
+            else:
+                node.rules.add(rule_id)
+            return
+
+        self.residual.append((re.compile(translate_glob(glob) + r"\Z"), rule_id))
+
+    def finalize(self):
+        """Build the merged prefilter regex over all residual globs."""
+        if self.residual:
+            self.merged = re.compile("|".join(f"(?:{regex.pattern})" for regex, _ in self.residual))
+        return self
+
+    # Matching
+
+    @staticmethod
+    def _suffixes(basename):
+        index = basename.find(".", 1)
+        while index != -1:
+            yield basename[index:]
+            index = basename.find(".", index + 1)
+
+    def match_ids(self, path):
+        path = path.replace("\\", "/")
+        if path.startswith("./"):
+            path = path[2:]
+        path = path.lstrip("/")
+
+        matched = set(self.always_rules)
+        matched |= self.match_all
+
+        segments = path.split("/")
+        basename = segments[-1]
+        suffixes = list(self._suffixes(basename))
+
+        for suffix in suffixes:
+            rules = self.ext_rules.get(suffix)
+            if rules:
+                matched |= rules
+
+        node = self.trie
+        for segment in segments[:-1]:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            matched |= node.rules
+            for suffix in suffixes:
+                rules = node.ext_rules.get(suffix)
+                if rules:
+                    matched |= rules
+
+        if self.merged is not None and self.merged.fullmatch(path):
+            for regex, rule_id in self.residual:
+                if rule_id not in matched and regex.match(path):
+                    matched.add(rule_id)
+
+        return matched
+
+    def match(self, path):
+        """Return the sorted names of the rules that apply to path."""
+        return sorted(self.rule_names[i] for i in self.match_ids(path))
+
+    def match_many(self, paths):
+        """Return {path: [rule names]} for an iterable of paths."""
+        return {path: self.match(path) for path in paths}
+
+
+def rules_signature(rules_dir):
+    """Identify the current state of all .mdc files in rules_dir."""
+    signature = []
+    for path in sorted(Path(rules_dir).rglob("*.mdc")):
+        stat = path.stat()
+        signature.append([path.relative_to(rules_dir).as_posix(), stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+def build_index(rules_dir, signature=None):
+    """Load every .mdc file in rules_dir and compile a RuleIndex."""
+    index = RuleIndex()
+    index.signature = signature if signature is not None else rules_signature(rules_dir)
+    for rel_path, _, _ in index.signature:
+        globs, always_apply = read_rule_globs(Path(rules_dir) / rel_path)
+        index.add_rule(rel_path[:-len(".mdc")], globs, always_apply)
+    return index.finalize()
+
+
+def default_cache_path(rules_dir):
+    """Cache file for rules_dir, kept out of the repository in the user's cache dir."""
+    digest = hashlib.sha1(str(Path(rules_dir).resolve()).encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{digest}.json"
+
+
+def _read_cache(cache_path, signature):
+    """Return the cached [name, globs, always_apply] list if it matches signature, else None.
+
+    The cache is plain data; globs are recompiled on load, so a tampered cache
+    can at worst produce wrong matches, never run code.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("version") != INDEX_VERSION or stored.get("signature") != signature:
+            return None
+        rules = stored["rules"]
+        for name, globs, always_apply in rules:
+            if (not isinstance(name, str) or not isinstance(globs, list)
+                    or not all(isinstance(glob, str) for glob in globs)):
+                return None
+        return rules
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(cache_path, rules_dir, index):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".rule_index.", suffix=".tmp", dir=cache_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "rules_dir": str(Path(rules_dir).resolve()),
+                       "signature": index.signature, "rules": index.rules}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def load_index(rules_dir, cache_path=None, rebuild=False):
+    """Return a RuleIndex for rules_dir, compiled from the cached globs if still valid."""
+    cache_path = Path(cache_path) if cache_path else default_cache_path(rules_dir)
+    signature = rules_signature(rules_dir)
+
+    rules = None if rebuild else _read_cache(cache_path, signature)
+    if rules is not None:
+        index = RuleIndex()
+        index.signature = signature
+        for name, globs, always_apply in rules:
+            index.add_rule(name, globs, always_apply)
+        return index.finalize()
+
+    index = build_index(rules_dir, signature)
+    try:
+        _write_cache(cache_path, rules_dir, index)
+    except OSError as e:
+        print(f"Warning: could not save rule index to {cache_path}: {e}", file=sys.stderr)
+    return index
+
+
+def main():
+    """Read paths from stdin and print the rules that apply to each."""
+    parser = argparse.ArgumentParser(description="Find which .mdc rules apply to paths read from stdin")
+    parser.add_argument("rules_dir", help="Directory containing .mdc rule files")
+    parser.add_argument("--cache", default=None,
+                        help=f"Index cache file (default: {CACHE_DIR}/<hash of rules_dir>.json)")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore and rebuild the compiled index")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per line")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.rules_dir):
+        print(f"Error: Rules directory '{args.rules_dir}' not found.")
+        sys.exit(1)
+
+    index = load_index(args.rules_dir, args.cache, args.rebuild)
+    out = sys.stdout
+    for line in sys.stdin:
+        path = line.rstrip("\r\n")
+        if not path:
+            continue
+        rules = index.match(path)
+        if args.json:
+            out.write(json.dumps({"path": path, "rules": rules}, ensure_ascii=False) + "\n")
+        else:
+            out.write(f"{path}\t{','.join(rules)}\n")
+
+
+if __name__ == "__main__":
+    main()
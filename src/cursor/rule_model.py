@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Compact, lazily decoded rule model shared by both cursor converters.
+
+Rules are represented by small `__slots__` objects holding byte offsets into
+one backing buffer (an mmap of the source file, or bytes). Metadata and
+content are decoded only when accessed, so loading tens of thousands of rules
+for analysis costs roughly 100-200 bytes per rule on top of the mapped file.
+
+Two source formats are supported:
+
+- "blocks": rule_parser's `---` metadata `---` content blocks (BlockRule)
+- "rules":  cursor_rules_convert's `---`-separated sections (SectionRule)
+
+Both round-trip back to .mdc with to_mdc(). batch_convert.py loads "blocks"
+sources through RuleBuffer, so each source is mapped rather than read into
+memory and each block is decoded only while it is written.
+
+Usage:
+    with RuleBuffer.open("rules.txt") as buffer:
+        for rule in buffer.rules("blocks"):
+            print(rule.description)
+"""
+import mmap
+import re
+
+from cursor_rules_convert import extract_rule_parts, format_mdc_file
+from rule_parser import RuleBlock, format_rule_block, parse_metadata_line, rule_filename
+
+SEPARATOR_LINE_PATTERN = re.compile(rb'^---\r?$', re.MULTILINE)
+SECTION_NAME_PATTERN = re.compile(rb'name:\s*(.*?)\.mdc', re.DOTALL)
+SECTION_DESCRIPTION_PATTERN = re.compile(rb'description:\s*(.*?)(?:\n|$)', re.DOTALL)
+SECTION_GLOBS_PATTERN = re.compile(rb'globs:\s*(.*?)(?:\n|$)', re.DOTALL)
+FORMATS = ("blocks", "rules")
+
+
+class LazyRule:
+    """Shared behaviour for rules backed by a buffer.
+
+    Subclasses provide the `metadata` and `content` properties and to_mdc().
+    """
+
+    __slots__ = ("_buffer",)
+
+    def _decode(self, start, end):
+        return bytes(self._buffer[start:end]).decode("utf-8")
+
+    @property
+    def description(self):
+        return self.metadata.get("description", "")
+
+    @property
+    def globs(self):
+        return self.metadata.get("globs", "")
+
+    def materialize(self):
+        """Return an eager RuleBlock copy that no longer depends on the buffer."""
+        block = RuleBlock()
+        block.metadata = dict(self.metadata)
+        block.content = self.content
+        return block
+
+
+class BlockRule(LazyRule):
+    """A rule_parser block: metadata and content spans."""
+
+    __slots__ = ("_meta_start", "_meta_end", "_body_start", "_body_end")
+
+    def __init__(self, buffer, meta_start, meta_end, body_start, body_end):
+        self._buffer = buffer
+        self._meta_start = meta_start
+        self._meta_end = meta_end
+        self._body_start = body_start
+        self._body_end = body_end
+
+    @property
+    def metadata(self):
+        metadata = {}
+        for line in self._decode(self._meta_start, self._meta_end).split("\n"):
+            parse_metadata_line(metadata, line.rstrip("\r"))
+        return metadata
+
+    @property
+    def content(self):
+        # iter_rule_blocks reads line by line and joins with "\n"; normalise CRLF the same way
+        return self._decode(self._body_start, self._body_end).replace("\r\n", "\n").strip()
+
+    def filename(self, index):
+        return rule_filename(self, index)
+
+    def to_mdc(self):
+        return format_rule_block(self)
+
+
+class SectionRule(LazyRule):
+    """A cursor_rules_convert section; content goes through extract_rule_parts on access."""
+
+    __slots__ = ("_start", "_end")
+
+    def __init__(self, buffer, start, end):
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    def parts(self):
+        return extract_rule_parts(self._decode(self._start, self._end))
+
+    def _field(self, pattern):
+        # Same patterns as extract_rule_parts, run on the span without decoding it
+        match = pattern.search(self._buffer, self._start, self._end)
+        return match.group(1).decode("utf-8").strip() if match else ""
+
+    @property
+    def name(self):
+        return self._field(SECTION_NAME_PATTERN)
+
+    @property
+    def metadata(self):
+        return {
+            "name": self.name,
+            "description": self._field(SECTION_DESCRIPTION_PATTERN),
+            "globs": self._field(SECTION_GLOBS_PATTERN),
+        }
+
+    @property
+    def content(self):
+        return self.parts()["content"]
+
+    def filename(self, index=None):
+        return f"{self.name}.mdc"
+
+    def to_mdc(self):
+        return format_mdc_file(self.parts())
+
+
+def scan_blocks(buffer):
+    """Yield a BlockRule for every rule_parser block in buffer.
+
+    Separator lines alternate between opening the metadata and opening the
+    content, matching rule_parser.iter_rule_blocks.
+    """
+    separators = SEPARATOR_LINE_PATTERN.finditer(buffer)
+    size = len(buffer)
+    opening = next(separators, None)
+    while opening is not None:
+        middle = next(separators, None)
+        if middle is None:
+            return
+        closing = next(separators, None)
+        body_end = closing.start() if closing is not None else size
+        yield BlockRule(buffer, opening.end() + 1, middle.start(), min(middle.end() + 1, size), body_end)
+        opening = closing
+
+
+def scan_sections(buffer):
+    """Yield a SectionRule for every named cursor_rules_convert section in buffer."""
+    size = len(buffer)
+    start = 0
+    while start <= size:
+        end = buffer.find(b"---", start)
+        if end == -1:
+            end = size
+        if SECTION_NAME_PATTERN.search(buffer, start, end):
+            yield SectionRule(buffer, start, end)
+        start = end + 3
+
+
+class RuleBuffer:
+    """Backing buffer for lazy rules: an mmap of a file, or in-memory bytes."""
+
+    __slots__ = ("data", "_file")
+
+    def __init__(self, data, file=None):
+        self.data = data
+        self._file = file
+
+    @classmethod
+    def open(cls, path):
+        f = open(path, "rb")
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            data = b""
+        return cls(data, f)
+
+    def rules(self, source_format="blocks"):
+        if source_format == "blocks":
+            return scan_blocks(self.data)
+        if source_format == "rules":
+            return scan_sections(self.data)
+        raise ValueError(f"Unknown format: {source_format} (expected one of {FORMATS})")
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
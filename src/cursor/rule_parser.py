@@ -1,50 +1,100 @@
+import argparse
+import io
+import mmap
 import re
 import os
 from pathlib import Path
 
+from mdc_writer import OutputManifest, WriteStats, write_if_changed
+
 class RuleBlock:
+    __slots__ = ('metadata', 'content')
+
     def __init__(self):
         self.metadata = {}
         self.content = ""
 
+def parse_metadata_line(metadata, line):
+    """解析一行元数据并写入metadata字典"""
+    if ':' in line:
+        key, value = [x.strip() for x in line.split(':', 1)]
+        # 处理布尔值
+        if value.lower() == 'true':
+            value = True
+        elif value.lower() == 'false':
+            value = False
+        metadata[key] = value
+
+def _iter_lines(source):
+    """逐行读取文本、文件对象或mmap，统一返回去掉换行符的str"""
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    elif isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    if isinstance(source, mmap.mmap):
+        readline = source.readline
+        while True:
+            line = readline()
+            if not line:
+                break
+            yield line.decode('utf-8').rstrip('\r\n')
+        return
+
+    for line in source:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        yield line.rstrip('\r\n')
+
+def iter_rule_blocks(source):
+    """逐行扫描规则块，增量返回RuleBlock对象
+
+    source 可以是字符串、二进制/文本文件对象或mmap。内存占用只与单个规则块的大小相关，
+    扫描时间与输入长度成线性关系。
+    """
+    # 状态：None 为首个分隔符之前，'meta' 为元数据区，'content' 为内容区
+    state = None
+    block = None
+    content_lines = []
+
+    for line in _iter_lines(source):
+        if line == '---':
+            if state == 'content':
+                block.content = '\n'.join(content_lines).strip()
+                yield block
+            elif state == 'meta':
+                # 元数据结束，进入内容区
+                state = 'content'
+                content_lines = []
+                continue
+            # 分隔符同时开始下一个规则块的元数据区
+            state = 'meta'
+            block = RuleBlock()
+            continue
+
+        if state == 'meta':
+            parse_metadata_line(block.metadata, line)
+        elif state == 'content':
+            content_lines.append(line)
+
+    # 文件末尾的最后一个规则块
+    if state == 'content':
+        block.content = '\n'.join(content_lines).strip()
+        yield block
+
 def parse_rule_blocks(file_content):
     """解析规则块，返回RuleBlock对象列表"""
-    # 使用正则表达式匹配规则块
-    pattern = r'---\n(.*?)\n---\n(.*?)(?=(?:\n---\n)|$)'
-    matches = re.finditer(pattern, file_content, re.DOTALL)
-    
-    blocks = []
-    for match in matches:
-        block = RuleBlock()
-        
-        # 解析元数据部分
-        metadata_str = match.group(1)
-        for line in metadata_str.strip().split('\n'):
-            if ':' in line:
-                key, value = [x.strip() for x in line.split(':', 1)]
-                # 处理布尔值
-                if value.lower() == 'true':
-                    value = True
-                elif value.lower() == 'false':
-                    value = False
-                block.metadata[key] = value
-        
-        # 保存内容部分
-        block.content = match.group(2).strip()
-        blocks.append(block)
-    
-    return blocks
+    return list(iter_rule_blocks(file_content))
 
-def save_rule_file(block, output_dir, index):
-    """保存单个规则文件"""
+def rule_filename(block, index):
+    """根据描述生成规则文件名"""
     # 如果没有描述，使用默认名称
     description = block.metadata.get('description', f'rule_{index}')
     # 创建文件名：将描述转换为文件名安全的格式
-    filename = re.sub(r'[^w\\-_]', '_', description.lower()) + '.mdc'
-    
-    file_path = Path(output_dir) / filename
-    
-    # 构建文件内容
+    return re.sub(r'[^\w\-]', '_', str(description).lower()) + '.mdc'
+
+def format_rule_block(block):
+    """将规则块格式化为 .mdc 文件内容"""
     content = ['---']
     # 写入元数据
     for key, value in block.metadata.items():
@@ -52,44 +102,73 @@ def save_rule_file(block, output_dir, index):
     content.append('---\n')
     # 写入主要内容
     content.append(block.content)
+    return '\n'.join(content)
+
+def save_rule_file(block, output_dir, index, stats=None):
+    """保存单个规则文件，内容未变化时跳过写入"""
+    filename = rule_filename(block, index)
+    file_path = Path(output_dir) / filename
     
-    # 保存文件
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(content))
+    # 仅在内容变化时通过临时文件+重命名原子写入
+    status = write_if_changed(file_path, format_rule_block(block))
+    if stats is not None:
+        stats.record(file_path, status)
     
     return filename
 
-def process_rules_file(input_file, output_dir='.'): 
-    """处理规则文件并分割成独立的文件"""
+def process_rules_file(input_file, output_dir='.', prune=False):
+    """处理规则文件并分割成独立的文件
+
+    过期文件指此前由 input_file 生成、本次不再生成的 .mdc 文件（记录在输出目录的清单中），
+    prune=True 时删除它们；输出目录中的其他 .mdc 文件不受影响
+    """
     # 创建输出目录
     os.makedirs(output_dir, exist_ok=True)
     
-    # 读取输入文件
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 解析规则块
-    blocks = parse_rule_blocks(content)
-    
-    # 保存每个规则块
+    # 流式读取输入文件，逐个解析并保存规则块
     saved_files = []
-    for index, block in enumerate(blocks, 1):
-        filename = save_rule_file(block, output_dir, index)
-        saved_files.append(filename)
-        print(f"已创建规则文件: {filename}")
+    stats = WriteStats()
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for index, block in enumerate(iter_rule_blocks(f), 1):
+            filename = save_rule_file(block, output_dir, index, stats)
+            saved_files.append(filename)
+
+    manifest = OutputManifest(output_dir)
+    stats.find_stale(manifest, [input_file])
+    if prune:
+        stats.prune()
+    stats.update_manifest(manifest, input_file, stats.produced)
+    manifest.save()
+    print(f"新建: {stats.created}, 更新: {stats.updated}, 未变化: {stats.unchanged}, "
+          f"过期: {len(stats.stale)}, 已删除: {stats.pruned}")
     
     return saved_files
 
+def parse_arguments():
+    """解析命令行参数，未提供时交互式输入"""
+    parser = argparse.ArgumentParser(description='将规则块文件拆分为独立的 .mdc 文件')
+    parser.add_argument('--input', '-i', default=None, help='输入文件路径')
+    parser.add_argument('--output', '-o', default=None, help='输出目录')
+    parser.add_argument('--prune', action='store_true', help='删除此前由该输入文件生成、本次不再生成的 .mdc 文件')
+    args = parser.parse_args()
+
+    if args.input is None:
+        args.input = input('请输入输入文件路径: ')
+    if args.output is None:
+        args.output = input('请输入输出目录: ')
+    return args
+
 def main():
-    input_file = input('请输入输入文件路径: ')
-    output_dir = input('请输入输出目录: ')
+    args = parse_arguments()
+    input_file = args.input
+    output_dir = args.output
     
     # 导入os模块并创建输出目录
     import os
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    process_rules_file(input_file, output_dir)
+    process_rules_file(input_file, output_dir, prune=args.prune)
     print("所有规则文件已生成完成！")
 
 if __name__ == "__main__":
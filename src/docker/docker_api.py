@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""不依赖第三方库的 Docker Engine API 客户端
+
+通过 unix socket（默认 /var/run/docker.sock，也可用 DOCKER_HOST=unix:///path 指定）
+发送 HTTP/1.1 请求。每个线程复用一条 keep-alive 连接，可在线程池中并发使用。
+"""
+
+import http.client
+import json
+import os
+import socket
+import threading
+from urllib.parse import quote, urlencode
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+
+
+class DockerAPIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"Docker API 返回 {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def default_socket_path():
+    host = os.environ.get("DOCKER_HOST", "")
+    if host.startswith("unix://"):
+        return host[len("unix://"):]
+    return DEFAULT_SOCKET
+
+
+class DockerClient:
+    def __init__(self, socket_path=None, timeout=30, api_version=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self.prefix = f"/v{api_version}" if api_version else ""
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = UnixHTTPConnection(self.socket_path, self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+            with self._lock:
+                self._connections.discard(conn)
+
+    def request(self, method, path, query=None, body=None, timeout=None):
+        """发送请求并返回解码后的 JSON（无响应体时返回 None），状态码 >= 400 时抛出 DockerAPIError"""
+        url = self.prefix + path
+        if query:
+            url += "?" + urlencode({k: v for k, v in query.items() if v is not None})
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        # 服务端可能已关闭空闲连接，首次失败时重建连接重试一次
+        for attempt in range(2):
+            conn = self._connection()
+            conn.timeout = timeout or self.timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(conn.timeout)
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self._reset()
+                if attempt == 1:
+                    raise
+            except Exception:
+                self._reset()
+                raise
+
+        if response.status >= 400:
+            try:
+                message = json.loads(data).get("message", "")
+            except ValueError:
+                message = data.decode("utf-8", "replace")
+            raise DockerAPIError(response.status, message)
+        if not data:
+            return None
+        if "json" in (response.getheader("Content-Type") or ""):
+            return json.loads(data)
+        return data.decode("utf-8", "replace")
+
+    def ping(self):
+        return self.request("GET", "/_ping") == "OK"
+
+    def list_containers(self, all=False, filters=None):
+        query = {"all": "true" if all else None}
+        if filters:
+            query["filters"] = json.dumps(filters)
+        return self.request("GET", "/containers/json", query)
+
+    def inspect(self, container):
+        return self.request("GET", f"/containers/{quote(container, safe='')}/json")
+
+    def restart(self, container, stop_timeout=None):
+        """重启容器，Docker 在容器重新启动后才返回"""
+        # 请求需要等待容器停止，超时时间要覆盖 stop_timeout；
+        # 未给出时 Docker 使用容器配置的 StopTimeout，调用方应从 inspect 结果中取出后传入，否则按默认 10 秒计算
+        timeout = self.timeout + (stop_timeout or 10)
+        self.request("POST", f"/containers/{quote(container, safe='')}/restart",
+                     {"t": stop_timeout}, timeout=timeout)
+
+    def stats(self, container):
+        """返回容器的一次资源使用快照"""
+        return self.request("GET", f"/containers/{quote(container, safe='')}/stats",
+                            {"stream": "false", "one-shot": "true"})
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
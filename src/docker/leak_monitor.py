@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""按内存增长趋势重启容器，替代固定时间的定时重启
+
+周期性通过 Docker stats API（stream=false, one-shot）采样容器的内存和 CPU：
+- 每个容器用固定容量的 array('d') 环形缓冲区保存最近的样本，内存占用与运行时长无关
+- 对窗口内的内存做最小二乘线性拟合，得到增长速率（字节/秒）和拟合优度 R²
+- 内存已接近限制（--hard-ratio）时立即重启
+- 增长趋势稳定（R² ≥ --min-r2）且预计 --horizon 秒内超过 --threshold-ratio 时重启
+- 重启后进入冷却期并清空样本；健康的容器不会被重启
+
+采样在线程池中并发进行，每个线程复用一条 keep-alive 连接。重启交给单独的线程逐个执行，
+等待容器就绪期间采样照常进行；正在重启的容器不会被采样，也不会再次触发重启。
+获取容器列表失败时记录错误并沿用上一轮的列表，下一轮再重试。
+
+用法:
+    python leak_monitor.py --label leak-monitor=true --interval 30 --window 120 --horizon 3600
+    python leak_monitor.py web-1 web-2 --threshold-ratio 0.85 --dry-run --log /var/log/leak_monitor.jsonl
+"""
+
+import argparse
+import re
+import sys
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from docker_api import DockerAPIError, DockerClient
+from restart_orchestrator import JsonLinesLog, resolve_stop_timeout, utc_now, wait_until_ready
+
+# 命令行参数只有是至少 12 位的十六进制串时才按容器 ID 前缀匹配，避免 "web" 之类的名称误匹配 ID
+ID_PREFIX_PATTERN = re.compile(r"[0-9a-f]{12,64}")
+
+
+class RingBuffer:
+    """固定容量的 (时间, 值) 环形缓冲区"""
+
+    __slots__ = ("capacity", "times", "values", "start", "count")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.start = 0
+        self.count = 0
+
+    def append(self, t, value):
+        index = (self.start + self.count) % self.capacity
+        self.times[index] = t
+        self.values[index] = value
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+    def last(self):
+        index = (self.start + self.count - 1) % self.capacity
+        return self.times[index], self.values[index]
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            index = (self.start + i) % self.capacity
+            yield self.times[index], self.values[index]
+
+
+def linear_fit(samples):
+    """最小二乘拟合 value = slope * t + intercept，返回 (slope, r2)，样本不足时返回 None"""
+    samples = list(samples)
+    n = len(samples)
+    if n < 2:
+        return None
+    t0 = samples[0][0]
+    sum_x = sum_y = sum_xx = sum_xy = sum_yy = 0.0
+    for t, y in samples:
+        x = t - t0
+        sum_x += x
+        sum_y += y
+        sum_xx += x * x
+        sum_xy += x * y
+        sum_yy += y * y
+    var_x = n * sum_xx - sum_x * sum_x
+    if var_x <= 0:
+        return None
+    cov = n * sum_xy - sum_x * sum_y
+    var_y = n * sum_yy - sum_y * sum_y
+    slope = cov / var_x
+    r2 = cov * cov / (var_x * var_y) if var_y > 0 else 0.0
+    return slope, r2
+
+
+def memory_usage(stats):
+    """与 `docker stats` 相同的口径：总用量减去可回收的页缓存，返回 (用量, 限制)"""
+    memory = stats.get("memory_stats") or {}
+    usage = memory.get("usage")
+    if usage is None:
+        return None, None
+    details = memory.get("stats") or {}
+    # cgroup v2 为 inactive_file，v1 为 total_inactive_file / cache
+    cache = details.get("inactive_file", details.get("total_inactive_file", details.get("cache", 0)))
+    return max(0, usage - cache), memory.get("limit") or 0
+
+
+def cpu_totals(stats):
+    cpu = stats.get("cpu_stats") or {}
+    usage = (cpu.get("cpu_usage") or {}).get("total_usage")
+    system = cpu.get("system_cpu_usage")
+    cpus = cpu.get("online_cpus") or len((cpu.get("cpu_usage") or {}).get("percpu_usage") or []) or 1
+    return usage, system, cpus
+
+
+class ContainerState:
+    __slots__ = ("id", "name", "memory", "limit", "cpu", "cpu_percent", "cooldown_until", "restarts")
+
+    def __init__(self, container_id, name, capacity):
+        self.id = container_id
+        self.name = name
+        self.memory = RingBuffer(capacity)
+        self.limit = 0
+        self.cpu = None
+        self.cpu_percent = None
+        self.cooldown_until = 0.0
+        self.restarts = 0
+
+    def record(self, t, stats):
+        usage, limit = memory_usage(stats)
+        if usage is None:
+            return False
+        self.memory.append(t, usage)
+        self.limit = limit
+
+        # one-shot 模式下 precpu_stats 为空，用相邻两次采样计算 CPU 使用率
+        usage_ns, system_ns, cpus = cpu_totals(stats)
+        if usage_ns is not None and system_ns is not None:
+            if self.cpu is not None and system_ns > self.cpu[1]:
+                self.cpu_percent = (usage_ns - self.cpu[0]) / (system_ns - self.cpu[1]) * cpus * 100
+            self.cpu = (usage_ns, system_ns)
+        return True
+
+
+class LeakPolicy:
+    def __init__(self, threshold_ratio=0.9, hard_ratio=0.97, horizon=3600.0, min_samples=10,
+                 min_r2=0.8, min_slope=1024.0):
+        self.threshold_ratio = threshold_ratio
+        self.hard_ratio = hard_ratio
+        self.horizon = horizon
+        self.min_samples = min_samples
+        self.min_r2 = min_r2
+        self.min_slope = min_slope
+
+    def evaluate(self, state):
+        """返回重启原因字典，不需要重启时返回 None"""
+        if not len(state.memory) or state.limit <= 0:
+            return None
+        _, usage = state.memory.last()
+        ratio = usage / state.limit
+        if ratio >= self.hard_ratio:
+            return {"reason": "hard_limit", "usage": usage, "limit": state.limit, "ratio": round(ratio, 4)}
+
+        if len(state.memory) < self.min_samples:
+            return None
+        fit = linear_fit(state.memory)
+        if fit is None:
+            return None
+        slope, r2 = fit
+        if slope < self.min_slope or r2 < self.min_r2:
+            return None
+
+        threshold = self.threshold_ratio * state.limit
+        projected = usage + slope * self.horizon
+        if projected < threshold:
+            return None
+        return {
+            "reason": "projected_leak",
+            "usage": usage,
+            "limit": state.limit,
+            "ratio": round(ratio, 4),
+            "slope_bytes_per_second": round(slope, 1),
+            "r2": round(r2, 4),
+            "projected": round(projected),
+            "seconds_to_threshold": round(max(0.0, (threshold - usage) / slope), 1),
+        }
+
+
+class LeakMonitor:
+    def __init__(self, client, log, policy, containers=(), labels=(), window=120, workers=16,
+                 cooldown=1800.0, stop_timeout=None, health_timeout=300.0, settle=5.0,
+                 dry_run=False, clock=time.monotonic):
+        self.client = client
+        self.log = log
+        self.policy = policy
+        self.names = list(containers)
+        self.id_prefixes = [n for n in self.names if ID_PREFIX_PATTERN.fullmatch(n)]
+        self.labels = list(labels)
+        self.window = window
+        self.cooldown = cooldown
+        self.stop_timeout = stop_timeout
+        self.health_timeout = health_timeout
+        self.settle = settle
+        self.dry_run = dry_run
+        self.clock = clock
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.restart_pool = ThreadPoolExecutor(max_workers=1)
+        self.restarting = {}
+        self.states = {}
+
+    def _selected(self, item, name):
+        if name in self.names or any(item["Id"].startswith(n) for n in self.id_prefixes):
+            return True
+        labels = item.get("Labels") or {}
+        for selector in self.labels:
+            key, sep, value = selector.partition('=')
+            if key in labels and (not sep or labels[key] == value):
+                return True
+        return False
+
+    def refresh_containers(self):
+        """用一次 /containers/json 请求同步监控列表，已停止或消失的容器会被移除
+
+        重启中的容器可能暂时不在运行列表里，它的状态必须保留，否则重启线程设置的
+        冷却期会落在已被丢弃的对象上，重新加入的容器会立即再次被重启。
+        """
+        found = {}
+        for item in self.client.list_containers():
+            name = item["Names"][0].lstrip("/") if item.get("Names") else item["Id"][:12]
+            if self._selected(item, name):
+                found[item["Id"]] = name
+
+        for container_id in list(self.states):
+            if container_id not in found and container_id not in self.restarting:
+                del self.states[container_id]
+        for container_id, name in found.items():
+            if container_id not in self.states:
+                self.states[container_id] = ContainerState(container_id, name, self.window)
+
+    def _sample(self, state):
+        try:
+            return state, self.client.stats(state.id), None
+        except (DockerAPIError, OSError) as e:
+            return state, None, e
+
+    def sample(self):
+        """并发采样所有未在重启中的容器，返回成功采样的数量"""
+        sampled = 0
+        states = [state for state in self.states.values() if state.id not in self.restarting]
+        for state, stats, error in self.pool.map(self._sample, states):
+            if error is not None:
+                self.log.write({"event": "error", "time": utc_now(), "container": state.name, "error": str(error)})
+                continue
+            if state.record(self.clock(), stats):
+                sampled += 1
+        return sampled
+
+    def restart(self, state, decision):
+        record = {"event": "restart", "time": utc_now(), "container": state.name, "id": state.id[:12], **decision}
+        if state.cpu_percent is not None:
+            record["cpu_percent"] = round(state.cpu_percent, 2)
+        if self.dry_run:
+            record["status"] = "dry-run"
+        else:
+            start = self.clock()
+            try:
+                stop_timeout = self.stop_timeout
+                if stop_timeout is None:
+                    stop_timeout = resolve_stop_timeout(self.client.inspect(state.id))
+                self.client.restart(state.id, stop_timeout)
+                status, _ = wait_until_ready(self.client, state.id, self.health_timeout, self.settle, 1.0)
+                record["status"] = status
+            except (DockerAPIError, OSError) as e:
+                record["status"] = "error"
+                record["error"] = str(e)
+            record["total_seconds"] = round(self.clock() - start, 3)
+            state.restarts += 1
+        state.memory.clear()
+        state.cpu = None
+        state.cooldown_until = self.clock() + self.cooldown
+        self.log.write(record)
+        return record
+
+    def _reap(self):
+        """移除已结束的重启，restart 中未捕获的异常在这里抛出"""
+        for container_id, future in list(self.restarting.items()):
+            if future.done():
+                del self.restarting[container_id]
+                future.result()
+
+    def check(self):
+        """评估所有容器，把需要重启的容器交给重启线程，返回本轮新开始重启的决策列表
+
+        重启结束前该容器不参与采样和评估，结束后由 restart 清空样本并进入冷却期。
+        """
+        self._reap()
+        decisions = []
+        now = self.clock()
+        for state in list(self.states.values()):
+            if state.id in self.restarting or now < state.cooldown_until:
+                continue
+            decision = self.policy.evaluate(state)
+            if decision is not None:
+                self.restarting[state.id] = self.restart_pool.submit(self.restart, state, decision)
+                decisions.append(decision)
+        return decisions
+
+    def wait_restarts(self):
+        """等待所有进行中的重启结束"""
+        for future in list(self.restarting.values()):
+            future.result()
+        self._reap()
+
+    def cycle(self):
+        try:
+            self.refresh_containers()
+        except (DockerAPIError, OSError) as e:
+            self.log.write({"event": "error", "time": utc_now(), "error": f"获取容器列表失败: {e}"})
+        sampled = self.sample()
+        restarts = self.check()
+        return sampled, restarts
+
+    def run(self, interval, cycles=None, verbose=False):
+        count = 0
+        while cycles is None or count < cycles:
+            started = self.clock()
+            sampled, restarts = self.cycle()
+            count += 1
+            if verbose:
+                self.log.write({"event": "cycle", "time": utc_now(), "containers": len(self.states),
+                                "sampled": sampled, "restarts": len(restarts), "restarting": len(self.restarting),
+                                "seconds": round(self.clock() - started, 3)})
+            if cycles is not None and count >= cycles:
+                self.wait_restarts()
+                break
+            time.sleep(max(0.0, interval - (self.clock() - started)))
+
+    def close(self):
+        """等待进行中的重启结束后关闭线程池"""
+        self.restart_pool.shutdown()
+        self.pool.shutdown()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='根据内存增长趋势重启 Docker 容器')
+    parser.add_argument('containers', nargs='*', help='要监控的容器名称或 ID（按 ID 前缀匹配时至少 12 位）')
+    parser.add_argument('--label', '-l', action='append', default=[],
+                        help='同时监控带有该标签的运行中容器，格式 key 或 key=value，可重复指定')
+    parser.add_argument('--interval', type=float, default=30.0, help='采样间隔秒数 (默认: 30)')
+    parser.add_argument('--window', type=int, default=120, help='每个容器保留的样本数 (默认: 120)')
+    parser.add_argument('--min-samples', type=int, default=10, help='拟合趋势所需的最少样本数 (默认: 10)')
+    parser.add_argument('--threshold-ratio', type=float, default=0.9, help='预测用量达到内存限制的该比例时重启 (默认: 0.9)')
+    parser.add_argument('--hard-ratio', type=float, default=0.97, help='当前用量达到内存限制的该比例时立即重启 (默认: 0.97)')
+    parser.add_argument('--horizon', type=float, default=3600.0, help='预测的时间范围（秒） (默认: 3600)')
+    parser.add_argument('--min-r2', type=float, default=0.8, help='认定为持续增长所需的最小 R² (默认: 0.8)')
+    parser.add_argument('--min-slope', type=float, default=1024.0, help='认定为泄漏的最小增长速率（字节/秒） (默认: 1024)')
+    parser.add_argument('--cooldown', type=float, default=1800.0, help='重启后不再重启该容器的秒数 (默认: 1800)')
+    parser.add_argument('--workers', type=int, default=16, help='并发采样的线程数 (默认: 16)')
+    parser.add_argument('--stop-timeout', type=int, default=None, help='停止容器时等待的秒数 (默认: 容器配置的 StopTimeout)')
+    parser.add_argument('--health-timeout', type=float, default=300.0, help='重启后等待容器就绪的最长秒数 (默认: 300)')
+    parser.add_argument('--cycles', type=int, default=None, help='运行的采样轮数，默认一直运行')
+    parser.add_argument('--socket', default=None, help='Docker socket 路径 (默认: $DOCKER_HOST 或 /var/run/docker.sock)')
+    parser.add_argument('--log', default=None, help='JSON Lines 日志文件（追加写入），默认输出到标准输出')
+    parser.add_argument('--verbose', '-v', action='store_true', help='每轮采样输出一行统计')
+    parser.add_argument('--dry-run', action='store_true', help='只记录需要重启的容器，不实际重启')
+    args = parser.parse_args()
+    if not args.containers and not args.label:
+        parser.error('需要至少一个容器名称或 --label')
+    return args
+
+
+def main():
+    args = parse_arguments()
+    client = DockerClient(args.socket)
+    stream = open(args.log, 'a', encoding='utf-8') if args.log else sys.stdout
+    policy = LeakPolicy(threshold_ratio=args.threshold_ratio,
+                        hard_ratio=args.hard_ratio,
+                        horizon=args.horizon,
+                        min_samples=args.min_samples,
+                        min_r2=args.min_r2,
+                        min_slope=args.min_slope)
+    monitor = LeakMonitor(client, JsonLinesLog(stream), policy,
+                          containers=args.containers,
+                          labels=args.label,
+                          window=args.window,
+                          workers=args.workers,
+                          cooldown=args.cooldown,
+                          stop_timeout=args.stop_timeout,
+                          health_timeout=args.health_timeout,
+                          dry_run=args.dry_run)
+    try:
+        monitor.run(args.interval, args.cycles, args.verbose)
+    except KeyboardInterrupt:
+        pass
+    except (DockerAPIError, OSError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        monitor.close()
+        client.close()
+        if stream is not sys.stdout:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
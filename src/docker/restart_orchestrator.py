@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""错峰重启多个 Docker 容器
+
+替代为每个容器单独安装 cron 任务、同一时刻 `docker restart` 的做法：
+通过 Docker Engine API（unix socket）按顺序重启一组容器，
+- 同时重启的容器数由 --concurrency 限制
+- 相邻两次重启的开始时间至少间隔 --stagger 秒，再加上 [0, --jitter] 秒的随机抖动
+- 每个容器重启后等待健康检查通过（没有健康检查时等待其保持运行 --settle 秒），该槽位才会处理下一个容器
+- 失败数达到 --max-failures 后不再开始新的重启
+- 每次重启输出一行 JSON 记录（重启耗时、等待健康耗时、结果），最后输出一行汇总
+
+只需一条 cron 任务，例如:
+    0 4 * * * /usr/bin/python3 /opt/scripts/restart_orchestrator.py --label restart.nightly=true --log /var/log/docker_restart.jsonl
+
+用法:
+    python restart_orchestrator.py web-1 web-2 worker-1 -c 2 --stagger 20 --jitter 10
+    python restart_orchestrator.py --label restart.nightly=true --dry-run
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from docker_api import DockerAPIError, DockerClient
+
+HEALTHY = "healthy"
+RUNNING = "running"
+UNHEALTHY = "unhealthy"
+TIMEOUT = "timeout"
+ERROR = "error"
+SKIPPED = "skipped"
+OK_STATUSES = (HEALTHY, RUNNING)
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+class StaggerGate:
+    """保证相邻两次放行之间至少间隔 stagger + uniform(0, jitter) 秒"""
+
+    def __init__(self, stagger, jitter, sleep=time.sleep):
+        self.stagger = stagger
+        self.jitter = jitter
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.next_slot = None
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.next_slot is not None and now < self.next_slot:
+                self.sleep(self.next_slot - now)
+                now = time.monotonic()
+            self.next_slot = now + self.stagger + random.uniform(0, self.jitter)
+
+
+class JsonLinesLog:
+    """线程安全的 JSON Lines 日志"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def resolve_stop_timeout(info, stop_timeout=None):
+    """返回重启时等待容器停止的秒数：显式给出的值优先，否则取 inspect 结果中容器配置的 StopTimeout
+
+    两者都没有时返回 None，由 Docker 使用默认的 10 秒。
+    """
+    if stop_timeout is not None:
+        return stop_timeout
+    return (info.get("Config") or {}).get("StopTimeout")
+
+
+def wait_until_ready(client, container, health_timeout, settle, poll_interval, sleep=time.sleep):
+    """轮询容器状态，返回 (状态, 最后一次检查的 State)
+
+    有健康检查时等待 healthy（unhealthy 立即失败）；
+    没有健康检查时要求容器持续运行 settle 秒且没有再次重启。
+    """
+    deadline = time.monotonic() + health_timeout
+    running_since = None
+    started_at = None
+    state = {}
+    while True:
+        state = client.inspect(container).get("State") or {}
+        health = (state.get("Health") or {}).get("Status")
+        if health == HEALTHY:
+            return HEALTHY, state
+        if health == UNHEALTHY:
+            return UNHEALTHY, state
+        if health is None:
+            if not state.get("Running") or state.get("Restarting"):
+                running_since = None
+            elif running_since is None or state.get("StartedAt") != started_at:
+                running_since = time.monotonic()
+                started_at = state.get("StartedAt")
+            elif time.monotonic() - running_since >= settle:
+                return RUNNING, state
+        if time.monotonic() >= deadline:
+            return TIMEOUT, state
+        sleep(poll_interval)
+
+
+class RestartOrchestrator:
+    def __init__(self, client, log, concurrency=1, stagger=30.0, jitter=10.0, stop_timeout=None,
+                 health_timeout=300.0, settle=5.0, poll_interval=1.0, max_failures=1, dry_run=False,
+                 sleep=time.sleep):
+        self.client = client
+        self.log = log
+        self.concurrency = max(1, concurrency)
+        self.gate = StaggerGate(stagger, jitter, sleep)
+        self.stop_timeout = stop_timeout
+        self.health_timeout = health_timeout
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.max_failures = max_failures
+        self.dry_run = dry_run
+        self.sleep = sleep
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def _aborted(self):
+        with self.lock:
+            return self.max_failures > 0 and self.failures >= self.max_failures
+
+    def restart_one(self, container):
+        """重启一个容器并等待就绪，返回日志记录"""
+        record = {"event": "restart", "container": container}
+        if self._aborted():
+            record.update(status=SKIPPED, reason="失败次数已达上限")
+            self.log.write(record)
+            return record
+
+        self.gate.wait()
+        if self._aborted():
+            record.update(status=SKIPPED, reason="失败次数已达上限")
+            self.log.write(record)
+            return record
+
+        record["started_at"] = utc_now()
+        start = time.monotonic()
+        try:
+            info = self.client.inspect(container)
+            record["name"] = info.get("Name", "").lstrip("/")
+            record["id"] = info.get("Id", "")[:12]
+            if self.dry_run:
+                record["status"] = "dry-run"
+                self.log.write(record)
+                return record
+
+            self.client.restart(container, resolve_stop_timeout(info, self.stop_timeout))
+            restarted = time.monotonic()
+            record["restart_seconds"] = round(restarted - start, 3)
+
+            status, state = wait_until_ready(self.client, container, self.health_timeout, self.settle,
+                                             self.poll_interval, self.sleep)
+            record["ready_seconds"] = round(time.monotonic() - restarted, 3)
+            record["status"] = status
+            if status not in OK_STATUSES:
+                log = (state.get("Health") or {}).get("Log") or []
+                if log:
+                    record["health_output"] = (log[-1].get("Output") or "").strip()[-500:]
+        except (DockerAPIError, OSError) as e:
+            record["status"] = ERROR
+            record["error"] = str(e)
+
+        record["total_seconds"] = round(time.monotonic() - start, 3)
+        if record["status"] not in OK_STATUSES:
+            with self.lock:
+                self.failures += 1
+        self.log.write(record)
+        return record
+
+    def run(self, containers):
+        """按顺序错峰重启所有容器，返回汇总记录"""
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            records = list(pool.map(self.restart_one, containers))
+
+        counts = {}
+        for record in records:
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+        durations = [r["total_seconds"] for r in records if "total_seconds" in r]
+        summary = {
+            "event": "summary",
+            "finished_at": utc_now(),
+            "containers": len(records),
+            "statuses": counts,
+            "total_seconds": round(time.monotonic() - start, 3),
+            "max_restart_seconds": max(durations, default=0),
+        }
+        self.log.write(summary)
+        return summary
+
+
+def resolve_containers(client, names, labels):
+    """合并命令行给出的容器和按标签筛选出的运行中容器，保持顺序并去重"""
+    containers = list(names)
+    if labels:
+        for item in client.list_containers(filters={"label": labels}):
+            containers.append(item["Names"][0].lstrip("/") if item.get("Names") else item["Id"])
+    return list(dict.fromkeys(containers))
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='通过 Docker Engine API 错峰重启多个容器')
+    parser.add_argument('containers', nargs='*', help='要重启的容器名称或 ID（按给出的顺序重启）')
+    parser.add_argument('--label', '-l', action='append', default=[],
+                        help='同时重启带有该标签的运行中容器，格式 key 或 key=value，可重复指定')
+    parser.add_argument('--concurrency', '-c', type=int, default=1, help='同时重启的容器数 (默认: 1)')
+    parser.add_argument('--stagger', type=float, default=30.0, help='相邻两次重启的最小间隔秒数 (默认: 30)')
+    parser.add_argument('--jitter', type=float, default=10.0, help='额外随机间隔的上限秒数 (默认: 10)')
+    parser.add_argument('--stop-timeout', type=int, default=None, help='停止容器时等待的秒数，超时后强制终止 (默认: 容器配置的 StopTimeout)')
+    parser.add_argument('--health-timeout', type=float, default=300.0, help='等待容器就绪的最长秒数 (默认: 300)')
+    parser.add_argument('--settle', type=float, default=5.0, help='没有健康检查的容器需要持续运行的秒数 (默认: 5)')
+    parser.add_argument('--poll', type=float, default=1.0, help='检查容器状态的间隔秒数 (默认: 1)')
+    parser.add_argument('--max-failures', type=int, default=1, help='失败达到该次数后停止重启其余容器，0 表示不限制 (默认: 1)')
+    parser.add_argument('--socket', default=None, help='Docker socket 路径 (默认: $DOCKER_HOST 或 /var/run/docker.sock)')
+    parser.add_argument('--log', default=None, help='JSON Lines 日志文件（追加写入），默认输出到标准输出')
+    parser.add_argument('--dry-run', action='store_true', help='只检查容器并输出计划，不实际重启')
+    args = parser.parse_args()
+    if not args.containers and not args.label:
+        parser.error('需要至少一个容器名称或 --label')
+    return args
+
+
+def main():
+    args = parse_arguments()
+    client = DockerClient(args.socket)
+    stream = open(args.log, 'a', encoding='utf-8') if args.log else sys.stdout
+    try:
+        containers = resolve_containers(client, args.containers, args.label)
+        if not containers:
+            print("没有找到需要重启的容器", file=sys.stderr)
+            return
+        orchestrator = RestartOrchestrator(client, JsonLinesLog(stream),
+                                           concurrency=args.concurrency,
+                                           stagger=args.stagger,
+                                           jitter=args.jitter,
+                                           stop_timeout=args.stop_timeout,
+                                           health_timeout=args.health_timeout,
+                                           settle=args.settle,
+                                           poll_interval=args.poll,
+                                           max_failures=args.max_failures,
+                                           dry_run=args.dry_run)
+        summary = orchestrator.run(containers)
+    except (DockerAPIError, OSError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+        if stream is not sys.stdout:
+            stream.close()
+
+    failed = sum(count for status, count in summary["statuses"].items() if status not in OK_STATUSES + ("dry-run",))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from itertools import product
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+
+# 参数网格；fps 在当前转换流程中只影响帧间隔，不影响体积和画质，因此不参与调优
+DEFAULT_GRID = {
+    'max_colors': [32, 64, 128, 256],
+    'max_width': [320, 480, 800],
+    'optimize': [False, True],
+}
+
+# 特征分桶阈值
+FLAT_COLOR_LIMIT = 48          # 缩略图中的颜色数低于此值视为扁平卡通风格
+STATIC_FRAME_LIMIT = 1
+SHORT_FRAME_LIMIT = 30
+SMALL_FILE_LIMIT = 100 * 1024  # 字节
+
+# 质量评估时最多比较的帧数
+MAX_COMPARE_FRAMES = 8
+
+
+def extract_features(input_path):
+    """提取低成本的文件特征：颜色数、文件大小、帧数和宽度"""
+    file_size = os.path.getsize(input_path)
+
+    cap = cv2.VideoCapture(str(input_path))
+    frame_count = 0
+    width = 0
+    first_frame = None
+    if cap.isOpened():
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        ret, frame = cap.read()
+        if ret:
+            first_frame = frame
+    cap.release()
+
+    if first_frame is None:
+        first_frame = cv2.imread(str(input_path), cv2.IMREAD_COLOR)
+        frame_count = 1 if first_frame is not None else 0
+
+    colors = 0
+    if first_frame is not None:
+        width = first_frame.shape[1]
+        # 在 64x64 缩略图上统计 5 bit 量化后的颜色数，避免噪声放大差异
+        thumb = cv2.resize(first_frame, (64, 64), interpolation=cv2.INTER_AREA)
+        packed = (thumb[:, :, 0].astype(np.uint32) >> 3) << 10
+        packed |= (thumb[:, :, 1].astype(np.uint32) >> 3) << 5
+        packed |= thumb[:, :, 2].astype(np.uint32) >> 3
+        colors = int(np.unique(packed).size)
+
+    return {
+        'colors': colors,
+        'file_size': file_size,
+        'frame_count': max(frame_count, 1),
+        'width': width,
+    }
+
+
+def feature_key(features):
+    """将特征映射为预设分桶键，例如 flat/short/small"""
+    palette = 'flat' if features['colors'] <= FLAT_COLOR_LIMIT else 'rich'
+    if features['frame_count'] <= STATIC_FRAME_LIMIT:
+        motion = 'static'
+    elif features['frame_count'] <= SHORT_FRAME_LIMIT:
+        motion = 'short'
+    else:
+        motion = 'long'
+    size = 'small' if features['file_size'] <= SMALL_FILE_LIMIT else 'large'
+    return f'{palette}/{motion}/{size}'
+
+
+def load_reference_frames(input_path, max_width=None, limit=MAX_COMPARE_FRAMES):
+    """读取未量化的参考帧（RGB）
+
+    默认保持原始分辨率；给出 max_width 时只缩放到用户要求的最终输出宽度，
+    而不是候选参数的宽度，这样缩小尺寸造成的细节损失也会计入画质指标。
+    """
+    frames = []
+    cap = cv2.VideoCapture(str(input_path))
+    while cap.isOpened() and len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    if not frames:
+        img = cv2.imread(str(input_path), cv2.IMREAD_UNCHANGED)
+        if img is None:
+            return []
+        if img.ndim == 3 and img.shape[-1] == 4:
+            bgr = img[:, :, :3]
+            alpha_3d = np.stack((img[:, :, 3],) * 3, axis=-1) / 255.0
+            img = (bgr * alpha_3d + 255 * (1 - alpha_3d)).astype(np.uint8)
+        frames = [img]
+
+    result = []
+    for frame in frames:
+        height, width = frame.shape[:2]
+        if max_width and width > max_width:
+            new_height = int(height * max_width / width)
+            frame = cv2.resize(frame, (max_width, new_height), interpolation=cv2.INTER_AREA)
+        result.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return result
+
+
+def load_gif_frames(gif_path, limit=MAX_COMPARE_FRAMES):
+    """读取转换结果中的前若干帧（RGB）"""
+    frames = []
+    with Image.open(gif_path) as gif:
+        for frame in ImageSequence.Iterator(gif):
+            frames.append(np.asarray(frame.convert('RGB')))
+            if len(frames) >= limit:
+                break
+    return frames
+
+
+def psnr(reference, candidate):
+    """峰值信噪比 (dB)"""
+    mse = np.mean((reference.astype(np.float64) - candidate.astype(np.float64)) ** 2)
+    if mse == 0:
+        return float('inf')
+    return float(10 * np.log10(255.0 ** 2 / mse))
+
+
+def ssim(reference, candidate, block=8):
+    """基于 8x8 分块统计的灰度 SSIM，仅依赖 NumPy"""
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+
+    def to_gray(img):
+        return img.astype(np.float64) @ np.array([0.299, 0.587, 0.114])
+
+    x = to_gray(reference)
+    y = to_gray(candidate)
+    height = (x.shape[0] // block) * block
+    width = (x.shape[1] // block) * block
+    if height == 0 or width == 0:
+        return 1.0 if np.array_equal(x, y) else 0.0
+
+    def blocks(img):
+        img = img[:height, :width]
+        return img.reshape(height // block, block, width // block, block).swapaxes(1, 2).reshape(-1, block * block)
+
+    bx = blocks(x)
+    by = blocks(y)
+    mu_x = bx.mean(axis=1)
+    mu_y = by.mean(axis=1)
+    var_x = bx.var(axis=1)
+    var_y = by.var(axis=1)
+    cov = ((bx - mu_x[:, None]) * (by - mu_y[:, None])).mean(axis=1)
+
+    ssim_map = ((2 * mu_x * mu_y + c1) * (2 * cov + c2)) / ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2))
+    return float(ssim_map.mean())
+
+
+def measure_quality(input_path, gif_path, reference_width=None):
+    """将GIF帧放大到参考帧尺寸后比较，返回平均 SSIM 和 PSNR"""
+    reference = load_reference_frames(input_path, reference_width)
+    converted = load_gif_frames(gif_path)
+    pairs = []
+    for r, c in zip(reference, converted):
+        if r.shape != c.shape:
+            # 候选宽度较小（或静态图未缩放）时统一到参考尺寸，缩放损失计入指标
+            c = cv2.resize(c, (r.shape[1], r.shape[0]), interpolation=cv2.INTER_LINEAR)
+        pairs.append((r, c))
+    if not pairs:
+        return 0.0, 0.0
+
+    ssim_values = [ssim(r, c) for r, c in pairs]
+    psnr_values = [min(psnr(r, c), 100.0) for r, c in pairs]
+    return float(np.mean(ssim_values)), float(np.mean(psnr_values))
+
+
+def run_trial(input_path, params, quality, fps, work_dir, reference_width=None):
+    """用一组参数转换单个文件，返回耗时、体积和画质指标"""
+    # 延迟导入，避免与 webp2gif 的循环依赖
+    from webp2gif import convert_single_file
+
+    output_path = Path(work_dir) / f"trial_{os.getpid()}_{random.getrandbits(32):08x}.gif"
+    start = time.perf_counter()
+    success, _, error = convert_single_file((
+        str(input_path),
+        str(output_path),
+        quality,
+        params['optimize'],
+        params['max_colors'],
+        fps,
+        params['max_width'],
+    ))
+    elapsed = time.perf_counter() - start
+    if not success:
+        raise RuntimeError(error)
+
+    try:
+        output_size = output_path.stat().st_size
+        ssim_value, psnr_value = measure_quality(input_path, output_path, reference_width)
+    finally:
+        output_path.unlink(missing_ok=True)
+
+    return {
+        'encode_seconds': elapsed,
+        'output_size': output_size,
+        'ssim': ssim_value,
+        'psnr': psnr_value,
+    }
+
+
+def iter_grid(grid):
+    """展开参数网格"""
+    keys = list(grid)
+    for values in product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def choose_preset(trials, min_ssim, time_weight):
+    """在满足画质下限的参数中，选择体积与耗时综合代价最小的一组"""
+    if not trials:
+        return None
+
+    max_size = max(t['size_ratio'] for t in trials) or 1.0
+    max_time = max(t['encode_seconds'] for t in trials) or 1.0
+
+    def cost(trial):
+        return trial['size_ratio'] / max_size + time_weight * trial['encode_seconds'] / max_time
+
+    acceptable = [t for t in trials if t['ssim'] >= min_ssim]
+    if acceptable:
+        return min(acceptable, key=cost)
+    # 没有参数满足下限时，退而求其次选择画质最好的一组
+    return max(trials, key=lambda t: (t['ssim'], -cost(t)))
+
+
+def tune(input_dir, sample_size=40, quality=80, fps=0, grid=None, min_ssim=0.95, time_weight=0.25, seed=0,
+         max_width=None):
+    """对语料抽样并在参数网格上评测，按特征分桶拟合预设
+
+    max_width 为最终输出允许的最大宽度，画质以该宽度（未指定时为原始分辨率）的源帧为参考。
+    """
+    logger = logging.getLogger(__name__)
+    grid = dict(grid or DEFAULT_GRID)
+    if max_width:
+        # 超过输出上限的宽度没有意义，只保留不大于上限的候选
+        grid['max_width'] = [w for w in grid['max_width'] if w <= max_width] or [max_width]
+
+    webp_files = sorted(Path(input_dir).rglob("*.webp"))
+    if not webp_files:
+        raise FileNotFoundError(f"在 {input_dir} 中没有找到WEBP文件")
+
+    rng = random.Random(seed)
+    samples = rng.sample(webp_files, min(sample_size, len(webp_files)))
+    logger.info(f"从 {len(webp_files)} 个文件中抽样 {len(samples)} 个进行调优")
+
+    # results[key][参数元组] = 该分桶下每个样本的测量结果
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for webp_file in samples:
+            features = extract_features(webp_file)
+            key = feature_key(features)
+            bucket = results.setdefault(key, {})
+            for params in iter_grid(grid):
+                try:
+                    trial = run_trial(webp_file, params, quality, fps, work_dir, max_width)
+                except Exception as e:
+                    logger.warning(f"评测失败 {webp_file} {params}: {e}")
+                    continue
+                trial['size_ratio'] = trial['output_size'] / max(features['file_size'], 1)
+                bucket.setdefault(tuple(sorted(params.items())), []).append(trial)
+            logger.debug(f"{webp_file} -> {key}")
+
+    presets = {}
+    all_trials = {}
+    for key, bucket in results.items():
+        averaged = []
+        for param_items, trials in bucket.items():
+            summary = {name: float(np.mean([t[name] for t in trials]))
+                       for name in ('encode_seconds', 'size_ratio', 'ssim', 'psnr')}
+            summary['params'] = dict(param_items)
+            summary['samples'] = len(trials)
+            averaged.append(summary)
+            all_trials.setdefault(param_items, []).extend(trials)
+
+        best = choose_preset(averaged, min_ssim, time_weight)
+        if best:
+            presets[key] = {**best['params'], **{k: v for k, v in best.items() if k != 'params'}}
+
+    # 全局默认预设：所有样本汇总后的最优参数
+    overall = []
+    for param_items, trials in all_trials.items():
+        summary = {name: float(np.mean([t[name] for t in trials]))
+                   for name in ('encode_seconds', 'size_ratio', 'ssim', 'psnr')}
+        summary['params'] = dict(param_items)
+        overall.append(summary)
+    default = choose_preset(overall, min_ssim, time_weight)
+
+    return {
+        'version': 1,
+        'min_ssim': min_ssim,
+        'time_weight': time_weight,
+        'presets': presets,
+        'default': default['params'] if default else None,
+        'reference_width': max_width,
+    }
+
+
+def save_presets(presets, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(presets, f, indent=2, ensure_ascii=False)
+
+
+def load_presets(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def select_params(presets, input_path, defaults):
+    """根据文件特征选择转换参数，未命中分桶时回退到默认参数
+
+    defaults 中的 max_width 是调用方给定的宽度上限，预设只能在此之下选择更小的宽度。
+    """
+    params = dict(defaults)
+    if not presets:
+        return params
+
+    preset = presets.get('presets', {}).get(feature_key(extract_features(input_path)))
+    if preset is None:
+        preset = presets.get('default')
+    if preset:
+        for name in ('max_colors', 'max_width', 'optimize'):
+            if name in preset:
+                params[name] = preset[name]
+        if defaults.get('max_width') and params.get('max_width'):
+            params['max_width'] = min(params['max_width'], defaults['max_width'])
+    return params
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='抽样评测WEBP语料，学习按内容分桶的GIF转换预设')
+    parser.add_argument('--input', '-i', default='./webp',
+                        help='输入目录路径，包含WEBP文件 (默认: ./webp)')
+    parser.add_argument('--presets', '-p', default='presets.json',
+                        help='预设输出文件 (默认: presets.json)')
+    parser.add_argument('--samples', '-n', type=int, default=40,
+                        help='抽样文件数 (默认: 40)')
+    parser.add_argument('--quality', '-q', type=int, default=80,
+                        help='GIF质量 (1-100, 默认: 80)')
+    parser.add_argument('--max-width', '-w', type=int, default=None,
+                        help='最终输出的最大宽度，画质以该宽度的源帧为参考 (默认: 原始分辨率)')
+    parser.add_argument('--min-ssim', type=float, default=0.95,
+                        help='可接受的最低SSIM (默认: 0.95)')
+    parser.add_argument('--time-weight', type=float, default=0.25,
+                        help='编码耗时在代价中的权重 (默认: 0.25)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='抽样随机种子 (默认: 0)')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    presets = tune(args.input,
+                   sample_size=args.samples,
+                   quality=args.quality,
+                   min_ssim=args.min_ssim,
+                   time_weight=args.time_weight,
+                   seed=args.seed,
+                   max_width=args.max_width)
+    save_presets(presets, args.presets)
+
+    print(f"已学习 {len(presets['presets'])} 个分桶预设，保存到 {args.presets}")
+    for key, preset in sorted(presets['presets'].items()):
+        print(f"- {key}: 颜色={preset['max_colors']} 宽度={preset['max_width']} 优化={preset['optimize']} "
+              f"SSIM={preset['ssim']:.3f} 体积比={preset['size_ratio']:.2f} 耗时={preset['encode_seconds']:.3f}s")
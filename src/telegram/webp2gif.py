@@ -13,6 +13,8 @@ import psutil
 from PIL import Image
 from tqdm import tqdm
 
+from preset_tuner import load_presets, select_params
+
 
 def setup_logging():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -46,8 +48,20 @@ def get_optimal_workers():
 
 def convert_single_file(args):
     """单个文件转换函数"""
-    input_path, output_path, quality, optimize, max_colors, fps, max_width = args
+    input_path, output_path, quality, optimize, max_colors, fps, max_width = args[:7]
+    presets = args[7] if len(args) > 7 else None
     try:
+        # 如果提供了调优预设，按文件特征覆盖颜色数、宽度和优化选项
+        if presets:
+            params = select_params(presets, input_path, {
+                'max_colors': max_colors,
+                'max_width': max_width,
+                'optimize': optimize,
+            })
+            max_colors = params['max_colors']
+            max_width = params['max_width']
+            optimize = params['optimize']
+
         cap = cv2.VideoCapture(input_path)
         if not cap.isOpened():
             raise Exception("无法打开文件")
@@ -123,11 +137,22 @@ def convert_single_file(args):
         return False, input_path, str(e)
 
 
-def batch_convert(input_dir, output_dir, quality=80, optimize=False, max_colors=256, fps=0, max_width=800):
+def batch_convert(input_dir, output_dir, quality=80, optimize=False, max_colors=256, fps=0, max_width=800,
+                  presets_file=None):
     """批量转换目录中的所有WEBP文件"""
     logger = setup_logging()
     create_output_dir(output_dir)
 
+    # 加载 preset_tuner.py 学习到的预设
+    presets = None
+    if presets_file:
+        presets = load_presets(presets_file)
+        logger.info(f"使用调优预设: {presets_file} ({len(presets.get('presets', {}))} 个分桶)")
+        reference_width = presets.get('reference_width')
+        if reference_width != max_width:
+            logger.warning(f"预设以 {reference_width or '原始分辨率'} 宽度为画质参考，与当前最大宽度 {max_width} 不同，"
+                           f"预设宽度会被限制在 {max_width} 以内")
+
     # 收集所有需要转换的文件
     webp_files = list(Path(input_dir).rglob("*.webp"))
     total_files = len(webp_files)
@@ -151,7 +176,8 @@ def batch_convert(input_dir, output_dir, quality=80, optimize=False, max_colors=
             optimize,
             max_colors,
             fps,
-            max_width
+            max_width,
+            presets
         ))
 
     # 获取最优的工作进程数
@@ -221,6 +247,8 @@ def parse_arguments():
                         help='指定GIF帧率，0表示使用原始帧率 (默认: 0)')
     parser.add_argument('--max-width', '-w', type=int, default=None,
                         help='GIF最大宽度，超过会等比例缩放 (默认: 800)')
+    parser.add_argument('--presets', '-p', default=None,
+                        help='preset_tuner.py 生成的预设文件，按文件内容自动选择参数')
 
     args = parser.parse_args()
 
@@ -297,13 +325,15 @@ if __name__ == "__main__":
     print(f"- 最大颜色: {args.max_colors}")
     print(f"- 帧率设置: {args.fps if args.fps > 0 else '使用原始帧率'}")
     print(f"- 最大宽度: {args.max_width}像素")
+    print(f"- 调优预设: {args.presets or '未使用'}")
 
     batch_convert(args.input, args.output,
                   quality=args.quality,
                   optimize=args.optimize,
                   max_colors=args.max_colors,
                   fps=args.fps,
-                  max_width=args.max_width)
+                  max_width=args.max_width,
+                  presets_file=args.presets)
 
     # 记录结束时间和总耗时
     end_time = datetime.now()
@@ -0,0 +1,172 @@
+"""批量抓取大量小宇宙播客集合，逐条输出 JSONL，支持断点续抓
+
+- 从文件或标准输入逐行读取集合 URL（空行和 # 开头的行会被忽略），不会一次性读入全部输入
+- 同时处理的集合数由 --window 限制，内存占用与输入规模无关
+- 每个集合完成后立即追加一行 JSON 到输出文件并刷新
+- 已完成的 URL 记录在 SQLite 检查点中，中断后重新运行会跳过它们；失败的集合和部分播客页失败（errors 非空）
+  的集合不记录，下次会重试
+- 记录先写入输出再写入检查点，中断恰好发生在两者之间时该集合可能重复输出一次
+
+用法:
+    python batch_crawl.py collections.txt -o results.jsonl --checkpoint progress.db
+    cat collections.txt | python batch_crawl.py - --pids-only >> pids.jsonl
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+
+from http_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, HttpCache
+from podcast_crawler import PodcastCrawler
+from podcast_scraper import BASE_URL, extract_pids
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completed (
+    url TEXT PRIMARY KEY,
+    finished_at REAL NOT NULL
+);
+"""
+
+
+class Checkpoint:
+    """记录已完成集合 URL 的 SQLite 检查点，path 为 None 时只在内存中去重"""
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(str(path) if path else ":memory:")
+        self.conn.executescript(_SCHEMA)
+
+    def is_done(self, url):
+        return self.conn.execute("SELECT 1 FROM completed WHERE url = ?", (url,)).fetchone() is not None
+
+    def mark_done(self, url):
+        self.conn.execute("INSERT OR REPLACE INTO completed (url, finished_at) VALUES (?, ?)", (url, time.time()))
+        self.conn.commit()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM completed").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def iter_urls(stream):
+    """逐行产出集合 URL，跳过空行和注释"""
+    for line in stream:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
+
+
+async def crawl_pids(crawler, collection_url):
+    """只抓取集合页，返回与 crawl_collection 相同结构但不含播客详情的记录"""
+    pids = extract_pids(await crawler.fetch_next_data(collection_url))
+    return {"collection": collection_url, "pids": pids}
+
+
+async def batch_crawl(urls, output, checkpoint, crawler, window=4, pids_only=False):
+    """按输入顺序调度集合抓取，最多 window 个同时进行，完成一个写出一个
+
+    urls 可以是任意（惰性）可迭代对象，output 为文本流。返回统计字典。
+    """
+    stats = {"done": 0, "partial": 0, "skipped": 0, "failed": 0}
+    in_flight = {}
+    urls = iter(urls)
+
+    async def crawl_one(url):
+        if pids_only:
+            return await crawl_pids(crawler, url)
+        return await crawler.crawl_collection(url)
+
+    def write_record(record):
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+
+    async def drain(return_when):
+        finished, _ = await asyncio.wait(in_flight, return_when=return_when)
+        for task in finished:
+            url = in_flight.pop(task)
+            try:
+                record = task.result()
+            except Exception as e:
+                stats["failed"] += 1
+                write_record({"collection": url, "error": str(e)})
+                continue
+            write_record(record)
+            if record.get("errors"):
+                # 部分播客页失败，记录已输出但不写入检查点，下次重新抓取整个集合
+                stats["partial"] += 1
+                continue
+            checkpoint.mark_done(url)
+            stats["done"] += 1
+
+    while True:
+        # 输入可能是管道，在线程中读取下一行，避免阻塞正在进行的请求
+        url = await asyncio.to_thread(next, urls, None)
+        if url is None:
+            break
+        if url in in_flight.values() or checkpoint.is_done(url):
+            stats["skipped"] += 1
+            continue
+        in_flight[asyncio.create_task(crawl_one(url))] = url
+        if len(in_flight) >= window:
+            await drain(asyncio.FIRST_COMPLETED)
+
+    if in_flight:
+        await drain(asyncio.ALL_COMPLETED)
+    return stats
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='批量抓取小宇宙播客集合，逐条输出 JSONL')
+    parser.add_argument('input', nargs='?', default='-', help='每行一个集合URL的文件，- 表示标准输入 (默认: -)')
+    parser.add_argument('--output', '-o', default=None, help='JSONL 输出文件（追加写入），默认输出到标准输出')
+    parser.add_argument('--checkpoint', default=None, help='SQLite 检查点文件，记录已完成的集合以便续抓')
+    parser.add_argument('--window', '-w', type=int, default=4, help='同时处理的集合数 (默认: 4)')
+    parser.add_argument('--pids-only', action='store_true', help='只抓取集合页中的 pid，不请求播客页面')
+    parser.add_argument('--concurrency', '-c', type=int, default=8, help='最大并发请求数 (默认: 8)')
+    parser.add_argument('--rate', '-r', type=float, default=5.0, help='每秒最多请求数，0 表示不限速 (默认: 5)')
+    parser.add_argument('--retries', type=int, default=3, help='每个请求的最大尝试次数 (默认: 3)')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'站点根地址 (默认: {BASE_URL})')
+    parser.add_argument('--cache', default=None, help='SQLite 缓存文件路径，不指定则不使用缓存')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL,
+                        help=f'缓存新鲜时间（秒），过期后发送条件请求 (默认: {DEFAULT_TTL})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f'缓存大小上限（MB） (默认: {DEFAULT_MAX_BYTES // (1024 * 1024)})')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    start = time.perf_counter()
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    checkpoint = Checkpoint(args.checkpoint)
+    cache = HttpCache(args.cache, args.cache_ttl, args.cache_size * 1024 * 1024) if args.cache else None
+    crawler = PodcastCrawler(base_url=args.base_url, concurrency=args.concurrency, rate=args.rate,
+                             retries=args.retries, cache=cache)
+    stats = None
+    try:
+        stats = asyncio.run(batch_crawl(iter_urls(source), output, checkpoint, crawler,
+                                        window=max(1, args.window), pids_only=args.pids_only))
+    except KeyboardInterrupt:
+        print(f"已中断，检查点中共有 {checkpoint.count()} 个已完成的集合，重新运行即可续抓", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        crawler.close()
+        if cache is not None:
+            print(cache.summary(), file=sys.stderr)
+            cache.close()
+        checkpoint.close()
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"完成 {stats['done']} 个集合，部分失败 {stats['partial']} 个，跳过 {stats['skipped']} 个，失败 {stats['failed']} 个，"
+          f"耗时 {time.perf_counter() - start:.2f} 秒", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""对比 BeautifulSoup 与字节扫描提取 __NEXT_DATA__ 的耗时
+
+用法:
+    python bench_next_data.py [pages_dir] [--runs 20] [--size 1]
+
+给出 pages_dir 时使用其中保存的 .html 页面，否则生成一个约 --size MB 的合成播客页。
+"""
+import argparse
+import gc
+import json
+import pathlib
+import time
+
+import next_data
+
+
+def synthetic_page(size_mb):
+    episodes = []
+    while len(json.dumps(episodes)) < size_mb * 1024 * 1024 * 0.6:
+        i = len(episodes)
+        episodes.append({"eid": f"e{i:06d}", "title": f"第 {i} 期 <节目> & \"引号\"",
+                         "description": "简介 " * 40, "duration": 3600 + i})
+    data = {"props": {"pageProps": {
+        "podcast": {"pid": "p1", "title": "示例播客", "episodes": episodes},
+        "related": [{"pid": f"r{i}"} for i in range(200)],
+    }}, "page": "/podcast/[id]", "buildId": "bench"}
+    body = "".join(f'<div class="item"><a href="/e/{i}">第 {i} 项</a></div>' for i in range(4000))
+    return ('<!DOCTYPE html><html><head><title>bench</title></head><body>' + body +
+            '<script id="__NEXT_DATA__" type="application/json">' + json.dumps(data, ensure_ascii=False) +
+            '</script></body></html>').encode('utf-8')
+
+
+def bench(label, func, pages, runs):
+    # 与 timeit 一致，计时期间关闭垃圾回收，避免前一项产生的大量对象干扰后一项
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(runs):
+            for page in pages:
+                func(page)
+        elapsed = (time.perf_counter() - start) / (runs * len(pages))
+    finally:
+        gc.enable()
+    print(f"{label:<36} {elapsed * 1000:>10.3f} ms/页")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='__NEXT_DATA__ 提取性能对比')
+    parser.add_argument('pages_dir', nargs='?', help='保存的 .html 页面目录')
+    parser.add_argument('--runs', type=int, default=20, help='运行次数 (默认: 20)')
+    parser.add_argument('--size', type=float, default=1.0, help='合成页面大小（MB） (默认: 1)')
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = [path.read_bytes() for path in sorted(pathlib.Path(args.pages_dir).glob('*.html'))]
+    else:
+        pages = [synthetic_page(args.size)]
+    print(f"{len(pages)} 个页面，平均 {sum(map(len, pages)) / len(pages) / 1024:.0f} KB")
+
+    expected = [next_data._extract_with_soup(page) for page in pages]
+    assert [next_data.extract_next_data(page) for page in pages] == expected
+
+    bench("BeautifulSoup html.parser", next_data._extract_with_soup, pages, max(1, args.runs // 10))
+    bench("字节扫描 + json.loads", next_data.extract_next_data, pages, args.runs)
+    bench("仅定位脚本", next_data.find_payload, pages, args.runs)
+    bench("子树 props.pageProps.podcast", lambda page: next_data.extract_next_data(
+        page, ("props", "pageProps", "podcast")), pages, args.runs)
+    bench("子树 props.pageProps.related", lambda page: next_data.extract_next_data(
+        page, ("props", "pageProps", "related")), pages, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""增量同步小宇宙播客的单集列表
+
+第一页单集取自播客页 __NEXT_DATA__ 中的 podcast.episodes，之后按 loadMoreKey
+向单集列表接口分页请求（POST {"pid", "order": "desc", "limit", "loadMoreKey"}，
+响应 {"data": [...], "loadMoreKey": ...}）。接口地址和附加请求头可配置，
+便于使用需要鉴权的接口或在本地桩服务器上测试。附加请求头只随接口请求发送，不会发给页面请求。
+
+已见过的单集按 (pid, eid) 记录在本地 SQLite 索引中：
+- 某个播客首次完整翻到最后一页后标记为 complete
+- 之后同步时按时间倒序翻页，遇到第一个已索引的单集即停止，只抓取新增内容
+- 上次翻页中断（未 complete）时不会提前停止，会继续补齐旧单集
+未配置接口地址时只同步播客页中的第一页。
+
+用法:
+    python episode_sync.py <pid> [<pid> ...] --index episodes.db -o new_episodes.jsonl
+    python episode_sync.py --collection https://www.xiaoyuzhoufm.com/collection/podcast/<id> \\
+        --api https://api.example.com/v1/episode/list -H "x-jike-access-token: <token>"
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+
+from podcast_crawler import PodcastCrawler
+from podcast_scraper import BASE_URL, extract_pids, podcast_url
+
+DEFAULT_PAGE_SIZE = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    pid TEXT NOT NULL,
+    eid TEXT NOT NULL,
+    pub_date TEXT,
+    data TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (pid, eid)
+);
+CREATE TABLE IF NOT EXISTS podcasts (
+    pid TEXT PRIMARY KEY,
+    complete INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL
+);
+"""
+
+
+def normalize_episode(pid, episode):
+    """从接口或页面中的单集对象提取需要保存的字段"""
+    enclosure = episode.get("enclosure") or {}
+    media = episode.get("media") or {}
+    return {
+        "eid": episode["eid"],
+        "pid": episode.get("pid", pid),
+        "title": episode.get("title"),
+        "description": episode.get("description"),
+        "duration": episode.get("duration"),
+        "pub_date": episode.get("pubDate"),
+        "audio": enclosure.get("url") or (media.get("source") or {}).get("url"),
+    }
+
+
+class EpisodeIndex:
+    """每个播客已见过的单集索引"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(_SCHEMA)
+
+    def known(self, pid, eids):
+        """返回 eids 中已索引的单集 ID 集合"""
+        eids = list(eids)
+        if not eids:
+            return set()
+        placeholders = ",".join("?" * len(eids))
+        rows = self.conn.execute(
+            f"SELECT eid FROM episodes WHERE pid = ? AND eid IN ({placeholders})", [pid, *eids])
+        return {row[0] for row in rows}
+
+    def add(self, pid, episodes):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO episodes (pid, eid, pub_date, data, first_seen) VALUES (?, ?, ?, ?, ?)",
+            [(pid, e["eid"], e["pub_date"], json.dumps(e, ensure_ascii=False), now) for e in episodes])
+        self.conn.commit()
+
+    def is_complete(self, pid):
+        row = self.conn.execute("SELECT complete FROM podcasts WHERE pid = ?", (pid,)).fetchone()
+        return bool(row and row[0])
+
+    def mark_synced(self, pid, complete):
+        self.conn.execute(
+            "INSERT INTO podcasts (pid, complete, synced_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(pid) DO UPDATE SET complete = MAX(complete, excluded.complete), synced_at = excluded.synced_at",
+            (pid, int(complete), time.time()))
+        self.conn.commit()
+
+    def count(self, pid=None):
+        if pid is None:
+            return self.conn.execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM episodes WHERE pid = ?", (pid,)).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class EpisodeSync:
+    def __init__(self, crawler, index, api_url=None, page_size=DEFAULT_PAGE_SIZE, full=False, output=None,
+                 api_headers=None):
+        self.crawler = crawler
+        self.index = index
+        self.api_url = api_url
+        self.api_headers = api_headers
+        self.page_size = page_size
+        self.full = full
+        self.output = output
+
+    def _record(self, pid, episodes):
+        """新增单集先写入输出再写入索引，翻页中途失败时已抓到的单集也不会丢失"""
+        if self.output is not None and episodes:
+            for episode in episodes:
+                self.output.write(json.dumps(episode, ensure_ascii=False) + "\n")
+            self.output.flush()
+        self.index.add(pid, episodes)
+
+    async def first_page(self, pid):
+        data = await self.crawler.fetch_next_data(podcast_url(pid, self.crawler.base_url))
+        podcast = data.get("props", {}).get("pageProps", {}).get("podcast") or {}
+        return podcast.get("episodes") or [], podcast.get("episodeCount")
+
+    async def next_page(self, pid, load_more_key):
+        payload = {"pid": pid, "order": "desc", "limit": self.page_size, "loadMoreKey": load_more_key}
+        result = await self.crawler.post_json(self.api_url, payload, self.api_headers)
+        return result.get("data") or [], result.get("loadMoreKey")
+
+    async def sync_podcast(self, pid):
+        """同步一个播客，返回 {"pid", "new", "pages", "complete"}，new 为新增单集列表（时间倒序）
+
+        新增单集同时逐页写入 output（JSONL）。
+        """
+        stop_at_known = self.index.is_complete(pid) and not self.full
+        episodes, total = await self.first_page(pid)
+        load_more_key = None
+        if self.api_url and episodes and (total is None or len(episodes) < total):
+            # 页面中没有 loadMoreKey，用第一页最后一个单集构造，与接口返回的格式一致
+            last = episodes[-1]
+            load_more_key = {"direction": "NEXT", "pubDate": last.get("pubDate"), "id": last.get("eid")}
+
+        new, pages, reached_known = [], 0, False
+        while True:
+            pages += 1
+            batch = [normalize_episode(pid, e) for e in episodes if e.get("eid")]
+            known = self.index.known(pid, (e["eid"] for e in batch))
+            fresh = [e for e in batch if e["eid"] not in known]
+            self._record(pid, fresh)
+            new.extend(fresh)
+            if known and stop_at_known:
+                reached_known = True
+                break
+            if not load_more_key or not episodes:
+                break
+            episodes, load_more_key = await self.next_page(pid, load_more_key)
+
+        if reached_known or (total is not None and pages == 1 and len(episodes) >= total):
+            complete = True
+        else:
+            # 没有接口时只能拿到第一页，永远不算完整
+            complete = bool(self.api_url) and not load_more_key
+        self.index.mark_synced(pid, complete)
+        return {"pid": pid, "new": new, "pages": pages, "complete": complete}
+
+    async def sync(self, pids):
+        """并发同步多个播客，返回每个播客的摘要"""
+        async def run(pid):
+            try:
+                result = await self.sync_podcast(pid)
+            except Exception as e:
+                return {"pid": pid, "error": str(e)}
+            return {"pid": pid, "new": len(result["new"]), "pages": result["pages"], "complete": result["complete"]}
+
+        return await asyncio.gather(*(run(pid) for pid in pids))
+
+
+async def collect_pids(crawler, pids, collections):
+    pids = list(pids)
+    for url in collections:
+        pids.extend(extract_pids(await crawler.fetch_next_data(url)))
+    return list(dict.fromkeys(pids))
+
+
+def parse_header(value):
+    name, sep, content = value.partition(':')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"请求头格式应为 'Name: value': {value}")
+    return name.strip(), content.strip()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='增量同步小宇宙播客的单集列表')
+    parser.add_argument('pids', nargs='*', help='要同步的播客 pid')
+    parser.add_argument('--collection', action='append', default=[], help='同步该集合中的所有播客，可重复指定')
+    parser.add_argument('--index', default='episodes.db', help='SQLite 单集索引文件 (默认: episodes.db)')
+    parser.add_argument('--output', '-o', default=None, help='新增单集的 JSONL 输出文件（追加写入），默认输出到标准输出')
+    parser.add_argument('--api', default=None, help='单集列表分页接口地址，不指定则只同步播客页中的第一页')
+    parser.add_argument('--header', '-H', type=parse_header, action='append', default=[],
+                        help="只在请求 --api 接口时附加的请求头，格式 'Name: value'，可重复指定")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'接口每页单集数 (默认: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--full', action='store_true', help='忽略已索引的单集，完整翻页一遍')
+    parser.add_argument('--concurrency', '-c', type=int, default=4, help='最大并发请求数 (默认: 4)')
+    parser.add_argument('--rate', '-r', type=float, default=2.0, help='每秒最多请求数，0 表示不限速 (默认: 2)')
+    parser.add_argument('--retries', type=int, default=3, help='每个请求的最大尝试次数 (默认: 3)')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'站点根地址 (默认: {BASE_URL})')
+    args = parser.parse_args()
+    if not args.pids and not args.collection:
+        parser.error('需要至少一个 pid 或 --collection')
+    return args
+
+
+async def run(args, output):
+    crawler = PodcastCrawler(base_url=args.base_url, concurrency=args.concurrency, rate=args.rate,
+                             retries=args.retries)
+    index = EpisodeIndex(args.index)
+    try:
+        pids = await collect_pids(crawler, args.pids, args.collection)
+        syncer = EpisodeSync(crawler, index, args.api, args.page_size, args.full, output,
+                             api_headers=dict(args.header))
+        return await syncer.sync(pids), index.count()
+    finally:
+        index.close()
+        crawler.close()
+
+
+def main():
+    args = parse_arguments()
+    start = time.perf_counter()
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summaries, total = asyncio.run(run(args, output))
+    except Exception as e:
+        print(f"同步失败，错误信息: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    failed = [s for s in summaries if "error" in s]
+    for summary in failed:
+        print(f"{summary['pid']}: {summary['error']}", file=sys.stderr)
+    new = sum(s["new"] for s in summaries if "error" not in s)
+    pages = sum(s["pages"] for s in summaries if "error" not in s)
+    print(f"同步 {len(summaries)} 个播客，新增单集 {new} 个，请求 {pages} 页，失败 {len(failed)} 个，"
+          f"索引共 {total} 个单集，耗时 {time.perf_counter() - start:.2f} 秒", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
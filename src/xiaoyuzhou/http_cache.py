@@ -0,0 +1,183 @@
+"""基于 SQLite 的持久化 HTTP 响应缓存
+
+- 以 URL 为键保存响应体（zlib 压缩）、ETag 和 Last-Modified
+- TTL 内的缓存直接返回；过期后发送条件请求（If-None-Match / If-Modified-Since），304 时复用缓存
+- 同时缓存从页面中提取的 __NEXT_DATA__ JSON，命中时跳过 HTML 解析
+- 总大小超过上限时按最近访问时间（LRU）淘汰
+- 统计命中（fresh）、重新验证（304）、未命中和淘汰次数
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from podcast_scraper import extract_next_data
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    encoding TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    next_data TEXT,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class HttpCache:
+    """线程安全的 SQLite 响应缓存"""
+
+    def __init__(self, path, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def lookup(self, url):
+        """返回缓存条目字典，不存在时返回 None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, encoding, etag, last_modified, next_data, fetched_at FROM responses WHERE url = ?",
+                (url,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+        body, encoding, etag, last_modified, next_data, fetched_at = row
+        return {
+            "body": zlib.decompress(body),
+            "encoding": encoding,
+            "etag": etag,
+            "last_modified": last_modified,
+            "next_data": next_data,
+            "fetched_at": fetched_at,
+        }
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def store(self, url, body, encoding=None, etag=None, last_modified=None, next_data=None):
+        compressed = zlib.compress(body)
+        size = len(compressed) + len(next_data or "")
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, encoding, etag, last_modified, next_data, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, compressed, encoding, etag, last_modified, next_data, size, now, now))
+            self.stats["stores"] += 1
+            self._evict()
+            self.conn.commit()
+
+    def refresh(self, url):
+        """304 后更新条目的获取时间"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self.conn.commit()
+
+    def set_next_data(self, url, next_data):
+        with self.lock:
+            self.conn.execute("UPDATE responses SET next_data = ?, size = size + ? WHERE url = ?",
+                              (next_data, len(next_data), url))
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute(
+                "SELECT url, size FROM responses ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        reused = self.stats["hits"] + self.stats["revalidated"]
+        rate = reused / lookups * 100 if lookups else 0.0
+        return (f"缓存命中 {self.stats['hits']}，304 重新验证 {self.stats['revalidated']}，"
+                f"未命中 {self.stats['misses']}，淘汰 {self.stats['evictions']}，复用率 {rate:.1f}%")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CachedFetcher:
+    """带缓存和条件请求的页面获取器，get 与 get_next_data 可在多个线程中并发调用"""
+
+    def __init__(self, session, cache, timeout=10):
+        self.session = session
+        self.cache = cache
+        self.timeout = timeout
+
+    def _fetch(self, url):
+        """返回新鲜的缓存条目，必要时发送（条件）请求"""
+        entry = self.cache.lookup(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.count("hits")
+            return entry
+
+        conditional = {}
+        if entry is not None:
+            if entry["etag"]:
+                conditional["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                conditional["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=conditional, timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            self.cache.count("revalidated")
+            self.cache.refresh(url)
+            return entry
+
+        response.raise_for_status()
+        self.cache.count("misses")
+        entry = {
+            "body": response.content,
+            "encoding": response.encoding,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "next_data": None,
+        }
+        self.cache.store(url, entry["body"], entry["encoding"], entry["etag"], entry["last_modified"])
+        return entry
+
+    def get(self, url):
+        """返回页面文本"""
+        entry = self._fetch(url)
+        return entry["body"].decode(entry["encoding"] or "utf-8", errors="replace")
+
+    def get_next_data(self, url):
+        """返回页面的 __NEXT_DATA__，命中缓存时不再解析 HTML"""
+        entry = self._fetch(url)
+        if entry["next_data"] is not None:
+            return json.loads(entry["next_data"])
+
+        # Next.js 总以 UTF-8 输出，直接在原始字节上定位脚本，省去整页解码
+        data = extract_next_data(entry["body"])
+        if data is not None:
+            self.cache.set_next_data(url, json.dumps(data, ensure_ascii=False))
+        return data
@@ -0,0 +1,104 @@
+"""快速提取 Next.js 页面中的 __NEXT_DATA__
+
+先按字节扫描定位 <script id="__NEXT_DATA__"> 的内容，无需构建 HTML 解析树；
+定位失败时才回退到 BeautifulSoup。还可以只解码 JSON 中需要的子树
+（如 props.pageProps.collection），目标之后的同级键完全不会被解析。
+"""
+import json
+import re
+
+_SCRIPT_OPEN = re.compile(rb'<script\b[^>]*?\bid\s*=\s*["\']?__NEXT_DATA__["\']?[^>]*>', re.IGNORECASE)
+_SCRIPT_CLOSE = re.compile(rb'</script\s*>', re.IGNORECASE)
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_decoder = json.JSONDecoder()
+
+
+def _to_bytes(html):
+    return html.encode('utf-8') if isinstance(html, str) else html
+
+
+def find_payload(html):
+    """按字节扫描返回 __NEXT_DATA__ 脚本的原始内容（bytes），找不到时返回 None"""
+    html = _to_bytes(html)
+    opening = _SCRIPT_OPEN.search(html)
+    if opening is None:
+        return None
+    closing = _SCRIPT_CLOSE.search(html, opening.end())
+    if closing is None:
+        return None
+    return html[opening.end():closing.start()].strip()
+
+
+def _skip_whitespace(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _find_member(text, pos, key):
+    """pos 指向一个对象的 '{'，返回键 key 对应值的起始位置
+
+    目标之前的同级值交给 C 实现的 raw_decode 跳过，目标之后的内容完全不会被读取。
+    """
+    if text[pos:pos + 1] != '{':
+        raise KeyError(key)
+    pos = _skip_whitespace(text, pos + 1)
+    while text[pos:pos + 1] == '"':
+        name, pos = json.decoder.scanstring(text, pos + 1)
+        pos = _skip_whitespace(text, pos)
+        if text[pos:pos + 1] != ':':
+            raise ValueError(f"位置 {pos} 处应为冒号")
+        value_start = _skip_whitespace(text, pos + 1)
+        if name == key:
+            return value_start
+        _, pos = _decoder.raw_decode(text, value_start)
+        pos = _skip_whitespace(text, pos)
+        if text[pos:pos + 1] == ',':
+            pos = _skip_whitespace(text, pos + 1)
+    raise KeyError(key)
+
+
+def extract_subtree(payload, path):
+    """只解码 payload 中 path（键序列）指向的子树，路径不存在时抛出 KeyError"""
+    text = payload.decode('utf-8') if isinstance(payload, bytes) else payload
+    pos = _skip_whitespace(text, 0)
+    for key in path:
+        pos = _find_member(text, pos, key)
+    value, _ = _decoder.raw_decode(text, pos)
+    return value
+
+
+def _extract_with_soup(html):
+    """回退方案：用 BeautifulSoup 完整解析页面"""
+    from bs4 import BeautifulSoup
+
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup.find_all("script", id="__NEXT_DATA__"):
+        if script.string:
+            try:
+                return json.loads(script.string)
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def extract_next_data(html, path=None):
+    """提取 __NEXT_DATA__（或其中 path 指向的子树），找不到时返回 None
+
+    path 为键序列，例如 ("props", "pageProps", "collection")；子树不存在时抛出 KeyError。
+    """
+    payload = find_payload(html)
+    if payload:
+        try:
+            if path:
+                return extract_subtree(payload, path)
+            return json.loads(payload)
+        except (ValueError, IndexError):
+            pass
+
+    data = _extract_with_soup(html)
+    if data is None or not path:
+        return data
+    for key in path:
+        data = data[key]
+    return data
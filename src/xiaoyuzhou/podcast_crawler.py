@@ -0,0 +1,248 @@
+"""并发抓取小宇宙播客集合及其中每个播客页面
+
+先请求集合页取得所有 pid，再并发请求每个 /podcast/{pid} 页面，输出结构化的播客元数据。
+- 所有请求复用同一个 requests.Session（keep-alive 连接池），在线程中执行，由 asyncio 调度
+- 并发数由信号量限制，请求速率由令牌桶限制
+- 失败时按指数退避加随机抖动重试，仅对网络错误、429 和 5xx 重试
+- 可选的磁盘缓存（http_cache.py）：TTL 内直接复用，过期后发送条件请求
+
+base_url 可配置，便于在本地桩服务器上测试。
+
+用法:
+    python podcast_crawler.py https://www.xiaoyuzhoufm.com/collection/podcast/<id> -c 8 -r 5 -o podcasts.json
+"""
+import argparse
+import asyncio
+import functools
+import json
+import random
+import sys
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, CachedFetcher, HttpCache
+from podcast_scraper import BASE_URL, extract_next_data, extract_pids, headers, podcast_url
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """令牌桶限速：平均每秒 rate 个请求，最多允许 capacity 个突发请求"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_retryable(error):
+    """网络错误、超时、429 和 5xx 可以重试"""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUS
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def backoff_delay(attempt, base=0.5, cap=10.0):
+    """指数退避加全抖动：在 [0, min(cap, base * 2^attempt)] 内随机取值"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def extract_podcast_metadata(pid, data, url=None):
+    """从播客页 __NEXT_DATA__ 中提取结构化元数据"""
+    podcast = data.get("props", {}).get("pageProps", {}).get("podcast") or {}
+    image = podcast.get("image") or {}
+    return {
+        "pid": podcast.get("pid", pid),
+        "title": podcast.get("title"),
+        "author": podcast.get("author"),
+        "brief": podcast.get("brief"),
+        "description": podcast.get("description"),
+        "subscription_count": podcast.get("subscriptionCount"),
+        "episode_count": podcast.get("episodeCount"),
+        "latest_episode_pub_date": podcast.get("latestEpisodePubDate"),
+        "image": image.get("picUrl") or image.get("largePicUrl"),
+        "url": url or podcast_url(pid),
+    }
+
+
+class PodcastCrawler:
+    def __init__(self, base_url=BASE_URL, concurrency=8, rate=5.0, burst=None,
+                 retries=3, backoff_base=0.5, backoff_max=10.0, timeout=10, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.rate = rate
+        self.burst = burst
+
+        # 连接池大小与并发数一致，保证每个并发请求都能复用 keep-alive 连接
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.cache = cache
+        self.fetcher = CachedFetcher(self.session, cache, timeout) if cache is not None else None
+
+        self._semaphore = None
+        self._bucket = None
+
+    def _ensure_async_primitives(self):
+        # asyncio 原语需要在事件循环内创建
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._bucket = TokenBucket(self.rate, self.burst)
+
+    def _get_response(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def _get(self, url):
+        return self._get_response(url).text
+
+    def _get_next_data(self, url):
+        if self.fetcher is not None:
+            data = self.fetcher.get_next_data(url)
+        else:
+            data = extract_next_data(self._get_response(url).content)
+        if data is None:
+            raise ValueError(f"页面中没有找到 __NEXT_DATA__: {url}")
+        return data
+
+    async def _call(self, func, url):
+        """限速、限并发地在线程中执行请求，可重试错误按指数退避重试"""
+        self._ensure_async_primitives()
+        for attempt in range(self.retries):
+            try:
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    return await asyncio.to_thread(func, url)
+            except requests.RequestException as e:
+                if not is_retryable(e) or attempt == self.retries - 1:
+                    raise
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+
+    async def fetch(self, url):
+        """获取页面文本"""
+        if self.fetcher is not None:
+            return await self._call(self.fetcher.get, url)
+        return await self._call(self._get, url)
+
+    async def fetch_next_data(self, url):
+        """获取页面的 __NEXT_DATA__"""
+        return await self._call(self._get_next_data, url)
+
+    def _post_json(self, url, payload, headers=None):
+        response = self.session.post(url, json=payload, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def post_json(self, url, payload, headers=None):
+        """POST JSON 并返回解码后的响应，与页面请求共享限速、并发和重试
+
+        headers 只附加到这次请求上，不会进入共享会话（页面请求不会带上鉴权头）。
+        """
+        return await self._call(functools.partial(self._post_json, payload=payload, headers=headers), url)
+
+    async def fetch_podcast(self, pid):
+        url = podcast_url(pid, self.base_url)
+        return extract_podcast_metadata(pid, await self.fetch_next_data(url), url)
+
+    async def crawl_collection(self, collection_url):
+        """抓取集合页及其中所有播客页，返回 {"collection", "pids", "podcasts", "errors"}"""
+        pids = extract_pids(await self.fetch_next_data(collection_url))
+        results = await asyncio.gather(*(self.fetch_podcast(pid) for pid in pids), return_exceptions=True)
+
+        podcasts, errors = [], []
+        for pid, result in zip(pids, results):
+            if isinstance(result, Exception):
+                errors.append({"pid": pid, "error": str(result)})
+            else:
+                podcasts.append(result)
+        return {"collection": collection_url, "pids": pids, "podcasts": podcasts, "errors": errors}
+
+    def close(self):
+        self.session.close()
+
+
+async def crawl(collection_url, **kwargs):
+    crawler = PodcastCrawler(**kwargs)
+    try:
+        return await crawler.crawl_collection(collection_url)
+    finally:
+        crawler.close()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='并发抓取小宇宙播客集合中的播客元数据')
+    parser.add_argument('url', nargs='?', help='播客集合的URL')
+    parser.add_argument('--concurrency', '-c', type=int, default=8, help='最大并发请求数 (默认: 8)')
+    parser.add_argument('--rate', '-r', type=float, default=5.0, help='每秒最多请求数，0 表示不限速 (默认: 5)')
+    parser.add_argument('--retries', type=int, default=3, help='每个请求的最大尝试次数 (默认: 3)')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'站点根地址 (默认: {BASE_URL})')
+    parser.add_argument('--output', '-o', default=None, help='输出JSON文件，默认打印到标准输出')
+    parser.add_argument('--cache', default=None, help='SQLite 缓存文件路径，不指定则不使用缓存')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL,
+                        help=f'缓存新鲜时间（秒），过期后发送条件请求 (默认: {DEFAULT_TTL})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f'缓存大小上限（MB） (默认: {DEFAULT_MAX_BYTES // (1024 * 1024)})')
+    args = parser.parse_args()
+
+    if args.url is None:
+        args.url = input('请输入播客集合的URL: ').strip()
+    return args
+
+
+def main():
+    args = parse_arguments()
+    start = time.perf_counter()
+    cache = HttpCache(args.cache, args.cache_ttl, args.cache_size * 1024 * 1024) if args.cache else None
+    try:
+        result = asyncio.run(crawl(args.url,
+                                   base_url=args.base_url,
+                                   concurrency=args.concurrency,
+                                   rate=args.rate,
+                                   retries=args.retries,
+                                   cache=cache))
+    except Exception as e:
+        print(f"请求失败，错误信息: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            print(cache.summary(), file=sys.stderr)
+            cache.close()
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    print(f"共 {len(result['pids'])} 个播客，成功 {len(result['podcasts'])} 个，失败 {len(result['errors'])} 个，"
+          f"耗时 {time.perf_counter() - start:.2f} 秒", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
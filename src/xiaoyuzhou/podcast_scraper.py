@@ -1,8 +1,10 @@
-import json
 import time
 
 import requests
-from bs4 import BeautifulSoup
+
+import next_data
+
+BASE_URL = "https://www.xiaoyuzhoufm.com"
 
 # 设置请求头
 headers = {
@@ -15,38 +17,53 @@ headers = {
     'sec-ch-ua-platform': '"macOS"'
 }
 
-# url = "https://www.xiaoyuzhoufm.com/collection/podcast/67bc1526d3fc170cb3ec380e"
-url = input('请输入播客集合的URL: ')
 
-try:
-    for attempt in range(3):
+def fetch_html(url, retries=3):
+    """请求页面，失败时重试"""
+    for attempt in range(retries):
         try:
             response = requests.get(url, headers=headers, timeout=10)
             response.raise_for_status()
-            break
+            return response.text
         except requests.RequestException as e:
-            if attempt == 2:
+            if attempt == retries - 1:
                 raise e
             time.sleep(2)
 
-    html_content = response.text
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    scripts = soup.find_all("script", id="__NEXT_DATA__")
-    for script in scripts:
-        if script.string:
-            try:
-                data = json.loads(script.string)
-                target_data = data["props"]["pageProps"]["collection"]["target"]
-                pids = [item["pid"] for item in target_data if "pid" in item]
-                print(f"所有 pid: {pids}")
-                break
-            except json.JSONDecodeError:
-                continue
-
-    base_url = "https://www.xiaoyuzhoufm.com/podcast/"
-    urls = [f"{base_url}{pid}" for pid in pids]
-    print(f"所有播客链接: {urls}")
-
-except Exception as e:
-    print(f"请求失败，错误信息: {e}") 
\ No newline at end of file
+
+def extract_next_data(html_content, path=None):
+    """从页面中提取 __NEXT_DATA__ JSON（或其中 path 指向的子树），找不到时返回 None"""
+    return next_data.extract_next_data(html_content, path)
+
+
+def extract_pids(data):
+    """从集合页的 __NEXT_DATA__ 中提取所有 pid"""
+    target_data = data["props"]["pageProps"]["collection"]["target"]
+    return [item["pid"] for item in target_data if "pid" in item]
+
+
+def podcast_url(pid, base_url=BASE_URL):
+    return f"{base_url}/podcast/{pid}"
+
+
+def main():
+    # url = "https://www.xiaoyuzhoufm.com/collection/podcast/67bc1526d3fc170cb3ec380e"
+    url = input('请输入播客集合的URL: ')
+
+    try:
+        data = extract_next_data(fetch_html(url))
+        if data is None:
+            raise ValueError("页面中没有找到 __NEXT_DATA__")
+
+        pids = extract_pids(data)
+        print(f"所有 pid: {pids}")
+
+        urls = [podcast_url(pid) for pid in pids]
+        print(f"所有播客链接: {urls}")
+
+    except Exception as e:
+        print(f"请求失败，错误信息: {e}")
+
+
+if __name__ == "__main__":
+    main()
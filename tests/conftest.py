@@ -0,0 +1,48 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# src 下的脚本目录互相按同级模块导入，测试时同样加入 sys.path
+for path in (os.path.join(ROOT, "tests", "fixtures"),
+             os.path.join(ROOT, "src", "cursor"),
+             os.path.join(ROOT, "src", "docker"),
+             os.path.join(ROOT, "src", "xiaoyuzhou")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def site():
+    """小宇宙桩服务器，返回 (Site, base_url)"""
+    import xiaoyuzhou_stub
+
+    server, stub, base_url = xiaoyuzhou_stub.start()
+    try:
+        yield stub, base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def docker():
+    """假的 Docker 守护进程，返回 (FakeDocker, DockerClient)"""
+    import fake_docker
+    from docker_api import DockerClient
+
+    # unix socket 路径长度有限，不使用 pytest 的 tmp_path
+    directory = tempfile.mkdtemp(prefix="fake-docker-")
+    server, daemon = fake_docker.start(os.path.join(directory, "docker.sock"))
+    client = DockerClient(server.server_address)
+    try:
+        yield daemon, client
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,151 @@
+"""在 unix socket 上模拟 Docker Engine API 的最小子集，供 docker 脚本的测试使用
+
+支持 /_ping、/containers/json（与 Docker 一样默认只列出运行中的容器，支持 label 过滤）、
+/containers/<id>/json、/containers/<id>/stats 和 POST /containers/<id>/restart。
+重启会按容器的 restart_time 阻塞，期间容器不在运行；每次重启的时间和 t 参数记录在 restarts 中。
+fail_list 大于 0 时，接下来的这么多次 /containers/json 请求返回 500。
+"""
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeContainer:
+    def __init__(self, name, labels=None, health_delay=None, unhealthy=False, restart_time=0.05,
+                 stop_timeout=None):
+        self.name = name
+        self.id = name.encode().hex().ljust(64, "0")[:64]
+        self.labels = labels or {}
+        self.health_delay = health_delay
+        self.unhealthy = unhealthy
+        self.restart_time = restart_time
+        self.stop_timeout = stop_timeout
+        self.started = time.monotonic()
+        self.started_at = "t0"
+        self.running = True
+        self.stats = None
+
+    def state(self):
+        state = {"Running": self.running, "Restarting": not self.running, "StartedAt": self.started_at}
+        if self.health_delay is not None:
+            if time.monotonic() - self.started < self.health_delay:
+                status = "starting"
+            else:
+                status = "unhealthy" if self.unhealthy else "healthy"
+            log = [{"Output": "check failed: connection refused\n"}] if status == "unhealthy" else []
+            state["Health"] = {"Status": status, "Log": log}
+        return state
+
+
+class FakeDocker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.containers = {}
+        self.active = 0
+        self.max_active = 0
+        self.restarts = []
+        self.fail_list = 0
+
+    def add(self, name, **kwargs):
+        container = FakeContainer(name, **kwargs)
+        self.containers[name] = container
+        return container
+
+    def find(self, ref):
+        if ref in self.containers:
+            return self.containers[ref]
+        for container in self.containers.values():
+            if container.id == ref or (len(ref) >= 12 and container.id.startswith(ref)):
+                return container
+        return None
+
+    def restart(self, container, stop_timeout):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.restarts.append({"name": container.name, "time": time.monotonic(), "t": stop_timeout})
+        container.running = False
+        time.sleep(container.restart_time)
+        container.running = True
+        container.started = time.monotonic()
+        container.started_at = str(time.time())
+        with self.lock:
+            self.active -= 1
+
+
+def matches(container, selector):
+    key, sep, value = selector.partition("=")
+    return key in container.labels and (not sep or container.labels[key] == value)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def address_string(self):
+        return "unix"
+
+    def send(self, code, obj=None, raw=None):
+        body = raw if raw is not None else (json.dumps(obj).encode() if obj is not None else b"")
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain" if raw is not None else "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        docker = self.server.docker
+        path = urlsplit(self.path).path
+        if path == "/_ping":
+            return self.send(200, raw=b"OK")
+        if path == "/containers/json":
+            if docker.fail_list:
+                docker.fail_list -= 1
+                return self.send(500, {"message": "daemon busy"})
+            query = parse_qs(urlsplit(self.path).query)
+            labels = json.loads(query.get("filters", ["{}"])[0]).get("label", [])
+            listed = [c for c in docker.containers.values()
+                      if (c.running or query.get("all") == ["true"]) and all(matches(c, s) for s in labels)]
+            return self.send(200, [{"Id": c.id, "Names": ["/" + c.name], "Labels": c.labels} for c in listed])
+        parts = path.strip("/").split("/")
+        container = docker.find(parts[1])
+        if container is None:
+            return self.send(404, {"message": f"No such container: {parts[1]}"})
+        if parts[2] == "json":
+            config = {"StopTimeout": container.stop_timeout} if container.stop_timeout is not None else {}
+            return self.send(200, {"Id": container.id, "Name": "/" + container.name,
+                                   "Config": config, "State": container.state()})
+        if parts[2] == "stats":
+            return self.send(200, container.stats() if container.stats else {})
+        self.send(404, {"message": "not found"})
+
+    def do_POST(self):
+        docker = self.server.docker
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        container = docker.find(parts[1])
+        if container is None:
+            return self.send(404, {"message": f"No such container: {parts[1]}"})
+        t = parse_qs(url.query).get("t")
+        docker.restart(container, int(t[0]) if t else None)
+        self.send(204)
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def start(path):
+    """在 path 上启动假的 Docker 守护进程，返回 (server, FakeDocker)"""
+    if os.path.exists(path):
+        os.remove(path)
+    server = Server(path, Handler)
+    server.docker = FakeDocker()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.docker
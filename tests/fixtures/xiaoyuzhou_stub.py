@@ -0,0 +1,110 @@
+"""本地模拟小宇宙站点的 HTTP 桩服务器，供 xiaoyuzhou 脚本的测试使用
+
+- GET /collection/podcast/<id>：集合页，__NEXT_DATA__ 中包含 podcasts_per_collection 个 pid
+- GET /podcast/<pid>：播客页，包含 episodes 中该播客的前 FIRST_PAGE 个单集
+- POST /api：单集列表分页接口，按 loadMoreKey 返回下一页，第 api_fail_after 次之后的请求返回 404
+页面响应带 ETag，If-None-Match 匹配时返回 304（计入 not_modified）。
+failures 中的路径在前 N 次请求时返回 503；每个请求的方法、路径和请求头记录在 requests 中。
+"""
+import collections
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIRST_PAGE = 15
+
+
+def page(data):
+    return (f'<html><head><script src="x.js"></script></head><body><div>{"x" * 1000}</div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+            f'</body></html>').encode()
+
+
+class Site:
+    def __init__(self, podcasts_per_collection=30):
+        self.podcasts_per_collection = podcasts_per_collection
+        self.episodes = {}
+        self.failures = {}
+        self.api_fail_after = None
+        self.not_modified = 0
+        self.hits = collections.Counter()
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def set_podcast(self, pid, count):
+        """生成 count 个单集，按发布时间倒序排列"""
+        self.episodes[pid] = [{"eid": f"{pid}-e{i:04d}", "pid": pid, "title": f"Ep {i}",
+                               "pubDate": f"2024-01-01T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+                               "duration": 60 + i, "enclosure": {"url": f"http://a/{pid}/{i}.m4a"}}
+                              for i in reversed(range(count))]
+
+    def posts(self):
+        return sum(1 for method, _, _ in self.requests if method == "POST")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, code, body=b"", content_type="text/html", headers=()):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def track(self, method):
+        site = self.server.site
+        with site.lock:
+            site.hits[self.path] += 1
+            site.requests.append((method, self.path, dict(self.headers)))
+            return site.hits[self.path]
+
+    def do_GET(self):
+        site = self.server.site
+        hits = self.track("GET")
+        if hits <= site.failures.get(self.path, 0):
+            return self.send(503)
+        if self.path.startswith("/collection/"):
+            pids = [{"pid": f"p{i}"} for i in range(site.podcasts_per_collection)]
+            body = page({"props": {"pageProps": {"collection": {"target": pids}}}})
+        elif self.path.startswith("/podcast/"):
+            pid = self.path.rsplit("/", 1)[1]
+            episodes = site.episodes.get(pid, [])
+            podcast = {"pid": pid, "title": f"T {pid}", "episodeCount": len(episodes) or 5,
+                       "episodes": episodes[:FIRST_PAGE]}
+            body = page({"props": {"pageProps": {"podcast": podcast}}})
+        else:
+            return self.send(404)
+        etag = '"%x"' % (hash(body) & 0xffffffff)
+        if self.headers.get("If-None-Match") == etag:
+            with site.lock:
+                site.not_modified += 1
+            return self.send(304, headers=[("ETag", etag)])
+        self.send(200, body, headers=[("ETag", etag)])
+
+    def do_POST(self):
+        site = self.server.site
+        self.track("POST")
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if site.api_fail_after is not None and site.posts() > site.api_fail_after:
+            return self.send(404)
+        episodes = site.episodes[request["pid"]]
+        index = next(i for i, e in enumerate(episodes) if e["eid"] == request["loadMoreKey"]["id"]) + 1
+        chunk = episodes[index:index + request["limit"]]
+        key = None
+        if index + request["limit"] < len(episodes):
+            key = {"direction": "NEXT", "pubDate": chunk[-1]["pubDate"], "id": chunk[-1]["eid"]}
+        self.send(200, json.dumps({"data": chunk, "loadMoreKey": key}).encode(), "application/json")
+
+
+def start(site=None):
+    """启动桩服务器，返回 (server, site, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.site = site or Site()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.site, f"http://127.0.0.1:{server.server_port}"
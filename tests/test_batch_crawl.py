@@ -0,0 +1,57 @@
+import asyncio
+import io
+import json
+
+import batch_crawl
+from podcast_crawler import PodcastCrawler
+
+
+def crawl(base_url, urls, checkpoint, **kwargs):
+    out = io.StringIO()
+    crawler = PodcastCrawler(base_url=base_url, rate=0, retries=1, backoff_base=0.01)
+    try:
+        stats = asyncio.run(batch_crawl.batch_crawl(urls, out, checkpoint, crawler, **kwargs))
+    finally:
+        crawler.close()
+    return stats, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_iter_urls_skips_blank_lines_and_comments():
+    stream = io.StringIO("a\n\n  # comment\n b \n")
+    assert list(batch_crawl.iter_urls(stream)) == ["a", "b"]
+
+
+def test_resume_from_checkpoint(site, tmp_path):
+    _, base_url = site
+    urls = [f"{base_url}/collection/podcast/c{i}" for i in range(6)]
+    checkpoint = batch_crawl.Checkpoint(str(tmp_path / "progress.db"))
+    try:
+        stats, _ = crawl(base_url, urls[:3], checkpoint, window=2, pids_only=True)
+        assert stats == {"done": 3, "partial": 0, "skipped": 0, "failed": 0}
+
+        stats, lines = crawl(base_url, urls + [base_url + "/bad/x"], checkpoint, window=2, pids_only=True)
+        assert stats == {"done": 3, "partial": 0, "skipped": 3, "failed": 1}
+        assert sorted(line["collection"] for line in lines if "error" not in line) == urls[3:]
+        assert checkpoint.count() == 6
+    finally:
+        checkpoint.close()
+
+
+
+def test_partial_collection_is_not_checkpointed(site):
+    stub, base_url = site
+    url = base_url + "/collection/podcast/c0"
+    stub.failures["/podcast/p3"] = 1
+    checkpoint = batch_crawl.Checkpoint()
+    try:
+        stats, lines = crawl(base_url, [url], checkpoint)
+        assert stats["partial"] == 1 and stats["done"] == 0
+        assert [e["pid"] for e in lines[0]["errors"]] == ["p3"]
+        assert not checkpoint.is_done(url)
+
+        stats, lines = crawl(base_url, [url], checkpoint)
+        assert stats["done"] == 1
+        assert lines[0]["errors"] == []
+        assert checkpoint.is_done(url)
+    finally:
+        checkpoint.close()
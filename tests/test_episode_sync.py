@@ -0,0 +1,75 @@
+import asyncio
+import io
+import json
+
+import episode_sync
+from podcast_crawler import PodcastCrawler
+
+
+def sync(base_url, index_path, pids, api=True, full=False, api_headers=None):
+    crawler = PodcastCrawler(base_url=base_url, rate=0, retries=1)
+    index = episode_sync.EpisodeIndex(index_path)
+    out = io.StringIO()
+    try:
+        syncer = episode_sync.EpisodeSync(crawler, index, base_url + "/api" if api else None, 20, full, out,
+                                          api_headers=api_headers)
+        summaries = asyncio.run(syncer.sync(pids))
+        return {s["pid"]: s for s in summaries}, [json.loads(line) for line in out.getvalue().splitlines()]
+    finally:
+        index.close()
+        crawler.close()
+
+
+def test_incremental_sync(site, tmp_path):
+    stub, base_url = site
+    path = str(tmp_path / "episodes.db")
+    stub.set_podcast("a", 100)
+    stub.set_podcast("b", 10)
+
+    # 第一次同步在翻页中途失败，已抓到的单集仍然写入输出和索引
+    stub.api_fail_after = 2
+    summaries, lines = sync(base_url, path, ["a", "b"])
+    assert "error" in summaries["a"] and summaries["b"]["complete"]
+    assert len(lines) == 15 + 2 * 20 + 10
+
+    stub.api_fail_after = None
+    summaries, lines = sync(base_url, path, ["a", "b"])
+    assert summaries["a"]["complete"] and summaries["a"]["new"] == 100 - 55
+    assert len(lines) == 45
+
+    posts = stub.posts()
+    summaries, lines = sync(base_url, path, ["a", "b"])
+    assert lines == [] and summaries["a"]["pages"] == 1
+    assert stub.posts() == posts
+
+    stub.set_podcast("a", 103)
+    summaries, lines = sync(base_url, path, ["a"])
+    assert [e["eid"] for e in lines] == ["a-e0102", "a-e0101", "a-e0100"]
+
+    stub.set_podcast("a", 150)
+    summaries, lines = sync(base_url, path, ["a"])
+    assert len(lines) == 47 and summaries["a"]["pages"] == 3
+
+    summaries, lines = sync(base_url, path, ["a"], full=True)
+    assert lines == [] and summaries["a"]["pages"] == 8
+
+
+def test_without_api_only_first_page_is_synced(site, tmp_path):
+    stub, base_url = site
+    stub.set_podcast("a", 40)
+
+    summaries, lines = sync(base_url, str(tmp_path / "episodes.db"), ["a"], api=False)
+
+    assert len(lines) == 15 and not summaries["a"]["complete"]
+    assert stub.posts() == 0
+
+
+def test_api_headers_are_not_sent_with_page_requests(site, tmp_path):
+    stub, base_url = site
+    stub.set_podcast("a", 50)
+
+    summaries, lines = sync(base_url, str(tmp_path / "episodes.db"), ["a"], api_headers={"X-Token": "secret"})
+
+    assert summaries["a"]["complete"] and len(lines) == 50
+    tokens = [(method, headers.get("X-Token")) for method, _, headers in stub.requests]
+    assert tokens == [("GET", None), ("POST", "secret"), ("POST", "secret")]
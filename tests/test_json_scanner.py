@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+import json_scanner
+
+DOCUMENT = {
+    "plain": "value",
+    'quote"key': 'say "hi"',
+    "back\\slash": "C:\\path\\to\\",
+    "ends with backslash\\": "\\",
+    "braces": "{[not a nested value]}",
+    "unbalanced": "}}]] {",
+    "nested": {"a": [1, {"b": "}"}, []], "c": {"d": {}}},
+    "array": [[1, 2], {"x": [None, True, False]}, "]"],
+    "中文": "设置 ☃ — ok",
+    "escaped_unicode": "\u00e9\U0001f600",
+    "empty_object": {},
+    "empty_array": [],
+    "number": -12.5e3,
+    "true": True,
+    "null": None,
+}
+
+
+@pytest.fixture(autouse=True)
+def isolated_index(tmp_path, monkeypatch):
+    # 磁盘索引写到临时目录，进程内缓存每个用例重新开始
+    monkeypatch.setattr(json_scanner, "INDEX_DIR", tmp_path / "index")
+    monkeypatch.setattr(json_scanner, "_memory_index", {})
+
+
+def write_json(path, data, **kwargs):
+    path.write_text(json.dumps(data, **kwargs), encoding="utf-8")
+
+
+@pytest.mark.parametrize("dump_options", [
+    {},
+    {"indent": 2},
+    {"ensure_ascii": False},
+    {"ensure_ascii": False, "indent": "\t", "separators": (",", " : ")},
+])
+def test_read_keys_matches_json_load(tmp_path, dump_options):
+    path = tmp_path / "settings.json"
+    write_json(path, DOCUMENT, **dump_options)
+    with open(path, encoding="utf-8") as f:
+        expected = json.load(f)
+
+    assert json_scanner.read_keys(str(path), list(expected) + ["missing"]) == expected
+    assert list(json_scanner.get_key_index(str(path))) == list(expected)
+
+
+def test_empty_object(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text(" { \n } ", encoding="utf-8")
+    assert json_scanner.read_keys(str(path), ["a"]) == {}
+
+
+def test_duplicate_keys_use_last_value(tmp_path):
+    path = tmp_path / "dup.json"
+    path.write_text('{"a": 1, "b": {"a": 0}, "a": [2]}', encoding="utf-8")
+    assert json_scanner.read_keys(str(path), ["a"]) == {"a": json.loads(path.read_text(encoding="utf-8"))["a"]}
+
+
+def test_persisted_index_is_reused_and_invalidated(tmp_path):
+    path = tmp_path / "settings.json"
+    write_json(path, {"a": "first", "b": [1, 2]})
+    assert json_scanner.read_keys(str(path), ["b"]) == {"b": [1, 2]}
+    index_files = list((tmp_path / "index").glob("*.json"))
+    assert len(index_files) == 1
+
+    # 新进程：只剩磁盘索引
+    json_scanner._memory_index.clear()
+    stored = json.loads(index_files[0].read_text(encoding="utf-8"))
+    assert json_scanner.get_key_index(str(path)) == stored["keys"]
+
+    # 重写文件后偏移全部变化，旧索引必须失效
+    stat = os.stat(path)
+    write_json(path, {"new": {"x": "}"}, "a": "second value", "b": {"c": None}}, indent=4)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert json_scanner.read_keys(str(path), ["a", "b", "new"]) == {
+        "a": "second value", "b": {"c": None}, "new": {"x": "}"}}
+
+    json_scanner._memory_index.clear()
+    assert json_scanner.read_keys(str(path), ["b"]) == {"b": {"c": None}}
+
+
+@pytest.mark.parametrize("text", ['[1, 2]', '{"a" 1}', '{"a": 1 "b": 2}', '{"a": "unterminated}', '{"a": [1, 2}'])
+def test_invalid_documents_raise(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        json_scanner.read_keys(str(path), ["a"])
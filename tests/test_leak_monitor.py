@@ -0,0 +1,197 @@
+import io
+import json
+import time
+
+import leak_monitor as lm
+
+GB = 1 << 30
+
+
+def memory_stats(usage, t=0.0):
+    return {"memory_stats": {"usage": int(usage) + 50_000_000, "limit": GB,
+                             "stats": {"inactive_file": 50_000_000}},
+            "cpu_stats": {"cpu_usage": {"total_usage": int(t * 5e8)}, "system_cpu_usage": int(t * 4e9),
+                          "online_cpus": 4}}
+
+
+def test_ring_buffer_keeps_latest():
+    buffer = lm.RingBuffer(3)
+    for i in range(5):
+        buffer.append(float(i), i * 10.0)
+    assert list(buffer) == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert buffer.last() == (4.0, 40.0)
+    buffer.clear()
+    assert len(buffer) == 0
+
+
+def test_linear_fit():
+    slope, r2 = lm.linear_fit([(t, 3.0 * t + 7) for t in range(10)])
+    assert abs(slope - 3.0) < 1e-9
+    assert abs(r2 - 1.0) < 1e-9
+    assert lm.linear_fit([(0.0, 1.0)]) is None
+
+
+def test_memory_usage_excludes_page_cache():
+    assert lm.memory_usage(memory_stats(100)) == (100, GB)
+    assert lm.memory_usage({}) == (None, None)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_monitor(client, names, clock, **kwargs):
+    out = io.StringIO()
+    monitor = lm.LeakMonitor(client, lm.JsonLinesLog(out), lm.LeakPolicy(horizon=3600), containers=names,
+                             window=60, cooldown=600, settle=0.0, clock=clock, **kwargs)
+    return monitor, out
+
+
+def records(out, event="restart"):
+    return [r for r in map(json.loads, out.getvalue().splitlines()) if r["event"] == event]
+
+
+def test_restarts_only_leaking_container(docker):
+    daemon, client = docker
+    clock = Clock()
+    leak = {"restarts": 0, "since": 0.0}
+
+    def leaky_stats():
+        # 每次重启后内存从头开始增长
+        restarts = sum(1 for r in daemon.restarts if r["name"] == "leaky")
+        if restarts != leak["restarts"]:
+            leak.update(restarts=restarts, since=clock.now)
+        return memory_stats(0.2 * GB + (clock.now - leak["since"]) * 300_000, clock.now)
+
+    daemon.add("leaky", stop_timeout=20).stats = leaky_stats
+    daemon.add("flat").stats = lambda: memory_stats(0.5 * GB, clock.now)
+    daemon.add("full").stats = lambda: memory_stats(0.98 * GB, clock.now)
+
+    monitor, out = make_monitor(client, ["leaky", "flat", "full"], clock)
+    try:
+        for _ in range(40):
+            monitor.cycle()
+            monitor.wait_restarts()
+            clock.now += 30
+    finally:
+        monitor.close()
+
+    restarts = records(out)
+    reasons = {(r["container"], r["reason"]) for r in restarts}
+    assert reasons == {("leaky", "projected_leak"), ("full", "hard_limit")}
+    assert all(r["status"] == "running" for r in restarts)
+    counts = {s.name: s.restarts for s in monitor.states.values()}
+    assert counts["leaky"] >= 1 and counts["flat"] == 0 and counts["full"] == 2
+    # 没有 --stop-timeout 时沿用容器配置的 StopTimeout
+    assert {(r["name"], r["t"]) for r in daemon.restarts} == {("leaky", 20), ("full", None)}
+
+
+def test_selects_by_name_and_label(docker):
+    daemon, client = docker
+    daemon.add("web", labels={"leak-monitor": "true"})
+    daemon.add("db")
+    daemon.add("cache", labels={"leak-monitor": "false"})
+
+    monitor, _ = make_monitor(client, ["db"], Clock(), labels=["leak-monitor=true"])
+    try:
+        monitor.refresh_containers()
+    finally:
+        monitor.close()
+
+    assert sorted(s.name for s in monitor.states.values()) == ["db", "web"]
+
+
+def test_dry_run_does_not_restart(docker):
+    daemon, client = docker
+    daemon.add("full").stats = lambda: memory_stats(0.99 * GB)
+
+    monitor, out = make_monitor(client, ["full"], Clock(), dry_run=True)
+    try:
+        monitor.cycle()
+    finally:
+        monitor.close()
+
+    assert [r["status"] for r in records(out)] == ["dry-run"]
+    assert daemon.restarts == []
+
+
+def test_id_prefix_requires_twelve_hex_characters(docker):
+    daemon, client = docker
+    web = daemon.add("web")
+    other = daemon.add("other")
+
+    monitor, _ = make_monitor(client, [web.id[:12], other.id[:4]], Clock())
+    try:
+        monitor.refresh_containers()
+    finally:
+        monitor.close()
+
+    assert [s.name for s in monitor.states.values()] == ["web"]
+
+
+def test_restart_does_not_block_sampling(docker):
+    daemon, client = docker
+    daemon.add("full", restart_time=0.5).stats = lambda: memory_stats(0.99 * GB)
+    daemon.add("flat").stats = lambda: memory_stats(0.5 * GB)
+
+    monitor, out = make_monitor(client, ["full", "flat"], Clock())
+    try:
+        sampled, restarts = monitor.cycle()
+        assert sampled == 2 and [d["reason"] for d in restarts] == ["hard_limit"]
+        # 重启进行中：只采样其他容器，也不会再次触发重启
+        for _ in range(3):
+            sampled, restarts = monitor.cycle()
+            assert (sampled, restarts) == (1, [])
+        monitor.wait_restarts()
+    finally:
+        monitor.close()
+
+    assert [r["name"] for r in daemon.restarts] == ["full"]
+    assert len(records(out)) == 1
+
+
+def test_cooldown_survives_container_missing_from_list(docker):
+    daemon, client = docker
+    full = daemon.add("full", restart_time=0.5)
+    full.stats = lambda: memory_stats(0.99 * GB)
+    clock = Clock()
+
+    monitor, out = make_monitor(client, ["full"], clock)
+    try:
+        assert [d["reason"] for d in monitor.cycle()[1]] == ["hard_limit"]
+        while full.running:
+            time.sleep(0.01)
+        # 重启期间 /containers/json 不再列出该容器，状态仍需保留
+        assert client.list_containers() == []
+        monitor.cycle()
+        assert full.id in monitor.states
+        monitor.wait_restarts()
+        for _ in range(3):
+            clock.now += 30
+            assert monitor.cycle() == (1, [])
+    finally:
+        monitor.close()
+
+    assert monitor.states[full.id].cooldown_until == 600
+    assert [r["name"] for r in daemon.restarts] == ["full"]
+    assert len(records(out)) == 1
+
+
+def test_list_errors_do_not_stop_monitoring(docker):
+    daemon, client = docker
+    daemon.add("flat").stats = lambda: memory_stats(0.5 * GB)
+
+    monitor, out = make_monitor(client, ["flat"], Clock())
+    try:
+        monitor.refresh_containers()
+        daemon.fail_list = 2
+        monitor.run(0, cycles=3)
+    finally:
+        monitor.close()
+
+    assert len(records(out, "error")) == 2
+    assert len(monitor.states[daemon.find("flat").id].memory) == 3
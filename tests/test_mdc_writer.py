@@ -0,0 +1,70 @@
+import json
+
+import batch_convert
+import cursor_rules_convert
+import rule_parser
+from mdc_writer import MANIFEST_NAME
+
+
+def rules_text(*names):
+    return "---".join(f"\nname: {name}.mdc\ndescription: {name} rule\nglobs: *.py\n\nUse {name}.\n" for name in names)
+
+
+def blocks_text(*descriptions):
+    return "".join(f"---\ndescription: {d}\n---\nBody of {d}.\n" for d in descriptions)
+
+
+def test_prune_keeps_hand_written_and_other_inputs(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "my-own-rule.mdc").write_text("hand written", encoding="utf-8")
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text(rules_text("alpha", "beta"), encoding="utf-8")
+    second.write_text(rules_text("gamma"), encoding="utf-8")
+
+    cursor_rules_convert.process_rules_file(str(first), str(out), prune=True)
+    cursor_rules_convert.process_rules_file(str(second), str(out), prune=True)
+    # beta 从 first 中移除后只有它被视为过期
+    first.write_text(rules_text("alpha"), encoding="utf-8")
+    cursor_rules_convert.process_rules_file(str(first), str(out), prune=True)
+
+    assert sorted(p.name for p in out.glob("*.mdc")) == ["alpha.mdc", "gamma.mdc", "my-own-rule.mdc"]
+    manifest = json.loads((out / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["sources"] == {str(first): ["alpha.mdc"], str(second): ["gamma.mdc"]}
+
+
+def test_stale_files_stay_recorded_until_pruned(tmp_path, capsys):
+    out = tmp_path / "out"
+    source = tmp_path / "blocks.txt"
+    source.write_text(blocks_text("one", "two"), encoding="utf-8")
+    rule_parser.process_rules_file(str(source), str(out))
+
+    source.write_text(blocks_text("one"), encoding="utf-8")
+    rule_parser.process_rules_file(str(source), str(out))
+    assert (out / "two.mdc").exists()
+    assert "过期: 1, 已删除: 0" in capsys.readouterr().out
+
+    rule_parser.process_rules_file(str(source), str(out), prune=True)
+    assert not (out / "two.mdc").exists()
+    assert "过期: 1, 已删除: 1" in capsys.readouterr().out
+
+
+def test_batch_prune_skips_files_claimed_by_other_sources(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "notes.mdc").write_text("hand written", encoding="utf-8")
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    (rules / "a.txt").write_text(rules_text("alpha", "shared"), encoding="utf-8")
+    other = tmp_path / "other.txt"
+    other.write_text(rules_text("shared", "omega"), encoding="utf-8")
+
+    batch_convert.batch_convert([str(rules)], str(out), workers=1)
+    cursor_rules_convert.process_rules_file(str(other), str(out))
+    (rules / "a.txt").write_text(rules_text("alpha"), encoding="utf-8")
+    report = batch_convert.batch_convert([str(rules)], str(out), workers=1, prune=True)
+
+    # shared.mdc 仍由 other.txt 生成，不能删除
+    assert report["stale"] == []
+    assert sorted(p.name for p in out.glob("*.mdc")) == ["alpha.mdc", "notes.mdc", "omega.mdc", "shared.mdc"]
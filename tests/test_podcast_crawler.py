@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import podcast_crawler
+from http_cache import HttpCache
+
+
+def crawl(base_url, path="/collection/podcast/x", **kwargs):
+    options = dict(base_url=base_url, rate=0, backoff_base=0.01)
+    options.update(kwargs)
+    return asyncio.run(podcast_crawler.crawl(base_url + path, **options))
+
+
+def test_crawl_collection_retries_transient_errors(site):
+    stub, base_url = site
+    stub.failures["/podcast/p3"] = 1
+
+    result = crawl(base_url)
+
+    assert result["pids"] == [f"p{i}" for i in range(30)]
+    assert [p["pid"] for p in result["podcasts"]] == result["pids"]
+    assert result["errors"] == []
+    assert stub.hits["/podcast/p3"] == 2
+
+
+def test_crawl_collection_reports_failed_pages(site):
+    stub, base_url = site
+    stub.failures["/podcast/p5"] = 100
+
+    result = crawl(base_url, retries=2)
+
+    assert len(result["podcasts"]) == 29
+    assert [e["pid"] for e in result["errors"]] == ["p5"]
+    assert stub.hits["/podcast/p5"] == 2
+
+
+def test_cache_reuses_fresh_entries_and_revalidates_stale_ones(site, tmp_path):
+    stub, base_url = site
+    plain = crawl(base_url)
+
+    cache = HttpCache(str(tmp_path / "cache.db"), ttl=3600)
+    try:
+        assert crawl(base_url, cache=cache) == plain
+        requests = len(stub.requests)
+        assert crawl(base_url, cache=cache) == plain
+        assert len(stub.requests) == requests
+        assert cache.stats["hits"] == 31
+    finally:
+        cache.close()
+
+    cache = HttpCache(str(tmp_path / "cache.db"), ttl=0)
+    try:
+        assert crawl(base_url, cache=cache) == plain
+        assert cache.stats["revalidated"] == 31
+        assert stub.not_modified == 31
+    finally:
+        cache.close()
+
+
+def test_token_bucket_limits_rate():
+    async def acquire(bucket, count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    bucket = podcast_crawler.TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    asyncio.run(acquire(bucket, 6))
+    assert time.monotonic() - start >= 0.09
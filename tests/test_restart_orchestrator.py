@@ -0,0 +1,80 @@
+import io
+import json
+
+import pytest
+
+import restart_orchestrator as ro
+from docker_api import DockerAPIError
+
+
+def run(client, containers, **kwargs):
+    options = dict(concurrency=1, stagger=0, jitter=0, settle=0.1, poll_interval=0.02,
+                   health_timeout=5, max_failures=0)
+    options.update(kwargs)
+    out = io.StringIO()
+    summary = ro.RestartOrchestrator(client, ro.JsonLinesLog(out), **options).run(containers)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert records[-1] == summary
+    return {r["container"]: r for r in records[:-1]}, summary
+
+
+def test_inspect_missing_container(docker):
+    _, client = docker
+    assert client.ping()
+    with pytest.raises(DockerAPIError) as info:
+        client.inspect("nope")
+    assert info.value.status == 404
+
+
+def test_concurrency_and_stagger(docker):
+    daemon, client = docker
+    for i in range(4):
+        daemon.add(f"web{i}", health_delay=0.1)
+    daemon.add("plain")
+
+    records, summary = run(client, [f"web{i}" for i in range(4)] + ["plain", "nope"],
+                           concurrency=2, stagger=0.1)
+
+    assert summary["statuses"] == {"healthy": 4, "running": 1, "error": 1}
+    assert records["nope"]["status"] == "error"
+    assert daemon.max_active <= 2
+    times = [r["time"] for r in daemon.restarts]
+    assert all(b - a >= 0.09 for a, b in zip(times, times[1:]))
+
+
+def test_stops_after_max_failures(docker):
+    daemon, client = docker
+    daemon.add("bad", health_delay=0.05, unhealthy=True)
+    daemon.add("web0")
+    daemon.add("web1")
+
+    records, _ = run(client, ["bad", "web0", "web1"], max_failures=1)
+
+    assert records["bad"]["status"] == "unhealthy"
+    assert "connection refused" in records["bad"]["health_output"]
+    assert records["web0"]["status"] == records["web1"]["status"] == "skipped"
+    assert [r["name"] for r in daemon.restarts] == ["bad"]
+
+
+def test_stop_timeout_from_container_config(docker):
+    daemon, client = docker
+    daemon.add("slow", stop_timeout=45)
+    daemon.add("default")
+
+    run(client, ["slow", "default"])
+    assert [r["t"] for r in daemon.restarts] == [45, None]
+
+    daemon.restarts.clear()
+    run(client, ["slow", "default"], stop_timeout=3)
+    assert [r["t"] for r in daemon.restarts] == [3, 3]
+
+
+def test_resolve_containers_by_label(docker):
+    daemon, client = docker
+    daemon.add("web1", labels={"tier": "web"})
+    daemon.add("db", labels={"tier": "db"})
+    daemon.add("web2", labels={"tier": "web"})
+
+    assert ro.resolve_containers(client, ["db", "web1"], ["tier=web"]) == ["db", "web1", "web2"]
+    assert ro.resolve_containers(client, [], ["tier"]) == ["web1", "db", "web2"]
+    assert ro.resolve_containers(client, ["x"], ["tier=none"]) == ["x"]
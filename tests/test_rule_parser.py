@@ -0,0 +1,121 @@
+import io
+import mmap
+import random
+import re
+
+import pytest
+
+from rule_model import scan_blocks
+from rule_parser import iter_rule_blocks, parse_metadata_line
+
+LEGACY_PATTERN = r'---\n(.*?)\n---\n(.*?)(?=(?:\n---\n)|$)'
+
+
+def legacy_parse(file_content):
+    """parse_rule_blocks 改为逐行扫描之前的正则实现"""
+    blocks = []
+    for match in re.finditer(LEGACY_PATTERN, file_content, re.DOTALL):
+        metadata = {}
+        for line in match.group(1).strip().split('\n'):
+            if ':' in line:
+                key, value = [x.strip() for x in line.split(':', 1)]
+                if value.lower() == 'true':
+                    value = True
+                elif value.lower() == 'false':
+                    value = False
+                metadata[key] = value
+        blocks.append((metadata, match.group(2).strip()))
+    return blocks
+
+
+def generate_rules(seed, num_blocks=30, empty_last=False, trailing_separator=False):
+    """生成格式规范的规则块文件，内容中包含空行、缩进、非 ASCII 文本和不单独成行的 ---"""
+    rng = random.Random(seed)
+    parts = []
+    for i in range(num_blocks):
+        parts.append('---\n')
+        parts.append(f'description: rule {i} 规则\n')
+        if rng.random() < 0.7:
+            parts.append(f'globs: src/**/*.{rng.choice(["py", "ts", "md"])}\n')
+        parts.append(f'alwaysApply: {rng.choice(["true", "false", "False"])}\n')
+        parts.append('---\n')
+        last = i == num_blocks - 1
+        if last and empty_last:
+            continue
+        lines = [rng.choice([f'- item {j}: keep it short', '', '    indented: value', 'text --- inline', '中文内容'])
+                 for j in range(rng.randint(1, 8))]
+        if not any(line.strip() for line in lines):
+            lines.append('filler')
+        parts.append('\n'.join(lines) + ('\n' if not last or rng.random() < 0.5 else ''))
+    if trailing_separator:
+        parts.append('---\n')
+    return ''.join(parts)
+
+
+def blocks_of(rules):
+    return [(dict(rule.metadata), rule.content) for rule in rules]
+
+
+def parse_all(text, tmp_path):
+    """用所有受支持的输入类型解析同一份文本"""
+    data = text.encode('utf-8')
+    path = tmp_path / 'rules.txt'
+    path.write_bytes(data)
+    results = {
+        'str': blocks_of(iter_rule_blocks(text)),
+        'bytes': blocks_of(iter_rule_blocks(data)),
+        'scan_blocks bytes': blocks_of(scan_blocks(data)),
+    }
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        results['text file'] = blocks_of(iter_rule_blocks(f))
+    with open(path, 'rb') as f:
+        results['binary file'] = blocks_of(iter_rule_blocks(f))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            results['mmap'] = blocks_of(iter_rule_blocks(mapped))
+            results['scan_blocks mmap'] = blocks_of(scan_blocks(mapped))
+    return results
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('empty_last, trailing_separator', [(False, False), (True, False), (False, True)])
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_matches_legacy_regex(tmp_path, seed, empty_last, trailing_separator, newline):
+    text = generate_rules(seed, empty_last=empty_last, trailing_separator=trailing_separator)
+    expected = legacy_parse(text)
+    assert len(expected) == 30
+
+    for source, blocks in parse_all(text.replace('\n', newline), tmp_path).items():
+        assert blocks == expected, source
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_empty_last_block_before_trailing_separator(tmp_path, newline):
+    # 旧正则在这里把结尾的分隔符当成内容（'---'），逐行扫描按空内容处理
+    text = generate_rules(0, empty_last=True, trailing_separator=True)
+    expected = legacy_parse(text)
+    assert expected[-1][1] == '---'
+    expected[-1] = (expected[-1][0], '')
+
+    for source, blocks in parse_all(text.replace('\n', newline), tmp_path).items():
+        assert blocks == expected, source
+
+
+def test_empty_body_between_blocks(tmp_path):
+    text = '---\ndescription: a\n---\n\n---\ndescription: b\n---\nbody b\n'
+    expected = legacy_parse(text)
+    assert expected == [({'description': 'a'}, ''), ({'description': 'b'}, 'body b')]
+    for source, blocks in parse_all(text, tmp_path).items():
+        assert blocks == expected, source
+
+
+def test_text_before_first_separator_is_ignored(tmp_path):
+    text = 'preamble\n---\ndescription: a\n---\nbody\n'
+    for source, blocks in parse_all(text, tmp_path).items():
+        assert blocks == [({'description': 'a'}, 'body')], source
+
+
+def test_parse_metadata_line():
+    metadata = {}
+    for line in ('description: a: b', 'alwaysApply: TRUE', 'flag: false', 'no colon'):
+        parse_metadata_line(metadata, line)
+    assert metadata == {'description': 'a: b', 'alwaysApply': True, 'flag': False}